@@ -0,0 +1,169 @@
+"""Benchmark parse_fieldsets: the original BeautifulSoup parser vs the lxml one."""
+
+import argparse
+import html
+import random
+from time import perf_counter
+
+from bs4 import BeautifulSoup
+import yaml
+
+from ministerio_audit.config import OFFERS_DIR
+from ministerio_audit.parsing import parse_fieldsets
+
+RADIO_CHOICES = ["SI", "NO", "Inmediata", "En 15 días", "Más de 2 años", "Indiferente"]
+
+
+def bs4_parse_fieldsets(form_html):
+    """Reference implementation, as it was in ministerio_audit.selenium.scrape before the lxml parser."""
+    soup = BeautifulSoup(form_html, "lxml")
+    form = soup.find("form") or soup
+    fieldsets = []
+    for idx, fieldset in enumerate(form.find_all("fieldset"), start=1):
+        legend = fieldset.find("legend")
+        question = legend.get_text(" ", strip=True) if legend else ""
+        inputs = []
+        for input_el in fieldset.find_all(["input", "textarea", "select"]):
+            tag_name = input_el.name
+            input_type = (
+                input_el.get("type", "text") if tag_name == "input" else tag_name
+            )
+            input_id = input_el.get("id", "")
+            input_name = input_el.get("name", "")
+            label_text = ""
+            if input_id:
+                label = fieldset.find("label", attrs={"for": input_id})
+                if label:
+                    label_text = label.get_text(" ", strip=True)
+            entry = {
+                "type": input_type,
+                "id": input_id,
+                "name": input_name,
+                "label": label_text,
+            }
+            if tag_name == "select":
+                entry["options"] = [
+                    {
+                        "value": opt.get("value", ""),
+                        "label": opt.get_text(" ", strip=True),
+                    }
+                    for opt in input_el.find_all("option")
+                ]
+            inputs.append(entry)
+        fieldsets.append({"index": idx, "question": question, "inputs": inputs})
+    return fieldsets
+
+
+def _load_shapes():
+    """Fieldsets recorded in the offer YAML files (one input per question)."""
+    shapes = []
+    for path in sorted(OFFERS_DIR.glob("*.yaml")):
+        with path.open(encoding="utf-8") as f:
+            shapes.extend(yaml.safe_load(f).get("fieldsets") or [])
+    return shapes
+
+
+def _render_input(item, rng, extra_radios):
+    esc = html.escape
+    if item["type"] == "textarea":
+        return (
+            f'<div class="ij-FormTextarea"><textarea id="{esc(item["id"])}" '
+            f'name="{esc(item["name"])}" maxlength="500"></textarea>'
+            '<span class="ij-FormTextarea-counter">0/500</span></div>'
+        )
+    choices = [item] + [
+        {
+            "id": f'{item["id"]}_{n}',
+            "name": item["name"],
+            "label": rng.choice(RADIO_CHOICES),
+        }
+        for n in range(extra_radios)
+    ]
+    return "".join(
+        f'<div class="ij-FormRadio"><input type="radio" id="{esc(c["id"])}" '
+        f'name="{esc(c["name"])}" value="{n}">'
+        f'<label for="{esc(c["id"])}"><span>{esc(c["label"])}</span></label></div>'
+        for n, c in enumerate(choices)
+    )
+
+
+def _render_form(shapes, rng, extra_radios, with_select):
+    parts = []
+    for n, fieldset in enumerate(shapes):
+        inputs = "".join(
+            _render_input(item, rng, extra_radios) for item in fieldset["inputs"]
+        )
+        if with_select and n % 4 == 0:
+            options = "".join(
+                f'<option value="{v}">{html.escape(label)}</option>'
+                for v, label in enumerate(RADIO_CHOICES)
+            )
+            inputs += (
+                f'<label for="sel_{n}">Elige</label>'
+                f'<select id="sel_{n}" name="sel_{n}">{options}</select>'
+            )
+        parts.append(
+            '<fieldset class="ij-Fieldset"><legend class="ij-Fieldset-legend">'
+            f'<span>{html.escape(fieldset["question"])}</span></legend>{inputs}</fieldset>'
+        )
+    return (
+        '<form id="myForm" method="post" action="/candidate/apply">'
+        '<input type="hidden" name="token" value="x">'
+        f'{"".join(parts)}'
+        '<button id="botonEnviar" type="submit">Inscribirme</button></form>'
+    )
+
+
+def _time(func, corpus, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        for form_html in corpus:
+            func(form_html)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--forms", type=int, default=300, help="(default: %(default)s)")
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=1,
+        help="Copies of the recorded questions per form (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--extra-radios",
+        type=int,
+        default=3,
+        help="Radio options added next to each recorded answer (default: %(default)s)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="(default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="(default: %(default)s)")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    rng = random.Random(args.seed)
+    shapes = _load_shapes()
+    if not shapes:
+        raise SystemExit(f"No fieldsets found in {OFFERS_DIR}")
+    corpus = []
+    for _ in range(args.forms):
+        picked = rng.sample(shapes, rng.randint(1, len(shapes))) * args.scale
+        corpus.append(_render_form(picked, rng, args.extra_radios, with_select=True))
+    size = sum(len(form_html) for form_html in corpus)
+
+    mismatches = sum(bs4_parse_fieldsets(f) != parse_fieldsets(f) for f in corpus)
+    print(f"Corpus: {len(corpus)} forms from {len(shapes)} recorded questions, {size / 1e6:.1f} MB")
+    print(f"Output identical to BeautifulSoup: {mismatches == 0} ({mismatches} mismatches)")
+
+    for name, func in (("beautifulsoup", bs4_parse_fieldsets), ("lxml", parse_fieldsets)):
+        elapsed = _time(func, corpus, args.repeat)
+        print(f"{name:>14}: {elapsed:.3f}s ({len(corpus) / elapsed:,.0f} forms/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark HTML-to-text for mail bodies: BeautifulSoup vs the streaming extractor."""
+
+import argparse
+import random
+import re
+from time import perf_counter
+
+from bs4 import BeautifulSoup
+
+from ministerio_audit.mail.messages import INFOJOBS_LINK_RE
+from ministerio_audit.parsing import html_text_and_links
+
+ROW = (
+    '<tr><td class="c{i}" style="padding:8px;font-family:Arial">'
+    "<p>Oferta {i}: Auxiliar administrativo/a &amp; atención al cliente</p>"
+    '<a href="https://www.infojobs.net/barcelona/oferta-{i}/of-i{offer}'
+    '?applicationOrigin=mail&amp;searchId={i}">Ver oferta</a>'
+    "</td></tr>"
+)
+
+
+def _synthetic_mail(rng: random.Random, rows: int) -> str:
+    body = "".join(
+        ROW.format(i=i, offer="%030x" % rng.getrandbits(120)) for i in range(rows)
+    )
+    return (
+        "<html><head><style>td{color:#333} .c0{margin:0}</style></head><body>"
+        "<table><tr><td><h1>Te has inscrito a una oferta</h1></td></tr>"
+        f"{body}</table>"
+        "<script>var tracking = 1;</script>"
+        "<p>InfoJobs, S.L. &copy; Todos los derechos reservados</p>"
+        "</body></html>"
+    )
+
+
+def _bs4_path(html):
+    text = BeautifulSoup(html, "lxml").get_text(" ")
+    return text, INFOJOBS_LINK_RE.findall(text)
+
+
+def _streaming_path(html):
+    text, hrefs = html_text_and_links(html)
+    links = INFOJOBS_LINK_RE.findall(text)
+    links.extend(m.group(0) for m in map(INFOJOBS_LINK_RE.match, hrefs) if m)
+    return text, links
+
+
+def _time(func, corpus, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        for html in corpus:
+            func(html)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=2000, help="(default: %(default)s)")
+    parser.add_argument("--rows", type=int, default=20, help="Offer rows per mail (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="(default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="(default: %(default)s)")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    rng = random.Random(args.seed)
+    corpus = [_synthetic_mail(rng, rng.randint(1, args.rows)) for _ in range(args.messages)]
+    size = sum(len(html) for html in corpus)
+
+    sample_bs4 = _bs4_path(corpus[0])
+    sample_fast = _streaming_path(corpus[0])
+    same_text = re.sub(r"\s+", " ", sample_bs4[0]) == re.sub(r"\s+", " ", sample_fast[0])
+    print(f"Corpus: {len(corpus)} mails, {size / 1e6:.1f} MB")
+    print(f"Text matches BeautifulSoup: {same_text}")
+    print(f"Links found: bs4={len(sample_bs4[1])} streaming={len(sample_fast[1])}")
+
+    for name, func in (("beautifulsoup", _bs4_path), ("streaming", _streaming_path)):
+        elapsed = _time(func, corpus, args.repeat)
+        print(f"{name:>14}: {elapsed:.3f}s ({len(corpus) / elapsed:,.0f} mails/s)")
+
+
+if __name__ == "__main__":
+    main()
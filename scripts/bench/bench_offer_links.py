@@ -0,0 +1,141 @@
+"""Benchmark the mail-to-consult join: exact URLs vs offer-id index vs scanning."""
+
+import argparse
+import random
+from time import perf_counter
+from urllib.parse import quote
+
+import yaml
+
+from ministerio_audit.config import PROJECT_ROOT
+from ministerio_audit.parsing.links import OfferIndex, offer_id
+
+CITIES = ["barcelona", "madrid", "sant-just-desvern", "valencia", "sevilla"]
+SLUGS = ["mozo-almacen", "auxiliar-administrativo", "camarero", "preparador-pedidos", "dependiente"]
+
+
+def _seed_links():
+    """Offer URLs of config/urls.yaml, the shape every synthetic link copies."""
+    with (PROJECT_ROOT / "config" / "urls.yaml").open(encoding="utf-8") as f:
+        offers = yaml.safe_load(f).get("offers") or {}
+    return [offer["url"] for offer in offers.values()]
+
+
+def _offer_url(rng, oid, tracking):
+    url = f"https://www.infojobs.net/{rng.choice(CITIES)}/{rng.choice(SLUGS)}/of-i{oid}"
+    if tracking:
+        search = rng.randrange(10**10, 10**11)
+        url += (
+            f"?applicationOrigin=search-new%7Celement%7E{search}"
+            f"&searchId={search}&page={rng.randint(1, 5)}&sortBy=RELEVANCE"
+        )
+    return url
+
+
+def _mail_link(rng, oid):
+    url = _offer_url(rng, oid, tracking=rng.random() < 0.3)
+    if rng.random() < 0.2:
+        # tracked redirect wrapping the offer URL
+        return f"https://www.infojobs.net/redirect?target={quote(url, safe='')}&utm_source=email"
+    return url
+
+
+def _corpus(offers, mail_share, rng):
+    ids = [f"{rng.getrandbits(120):030x}" for _ in range(offers)]
+    consult = [_offer_url(rng, oid, tracking=True) for oid in ids]
+    mail = [[_mail_link(rng, oid)] for oid in ids if rng.random() < mail_share]
+    # links without an offer id in both sets
+    consult += [f"https://www.infojobs.net/candidate/application/{n}" for n in range(offers // 50)]
+    mail += [["https://www.infojobs.net/candidate/cv/view"] for _ in range(offers // 50)]
+    return consult, mail
+
+
+def _exact(consult, mail):
+    index = {}
+    for n, links in enumerate(mail):
+        for link in links:
+            index.setdefault(link, []).append(n)
+    return sum(link in index for link in consult)
+
+
+def _indexed(consult, mail):
+    index = OfferIndex()
+    for n, links in enumerate(mail):
+        index.add_many(links, n)
+    return sum(link in index for link in consult)
+
+
+def _scan(consult, mail):
+    flat = [link for links in mail for link in links]
+    matched = 0
+    for link in consult:
+        key = offer_id(link)
+        matched += any((key or link) in candidate for candidate in flat)
+    return matched
+
+
+def _build_report(consult, mail):
+    index = OfferIndex()
+    for n, links in enumerate(mail):
+        index.add_many(links, n)
+    return index.match_report(consult)
+
+
+def _time(func, consult, mail, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        matched = func(consult, mail)
+        best = min(best, perf_counter() - start)
+    return best, matched
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--offers", type=int, default=200000, help="(default: %(default)s)")
+    parser.add_argument(
+        "--mail-share",
+        type=float,
+        default=0.6,
+        help="Share of offers with a confirmation mail (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--scan-sample",
+        type=int,
+        default=2000,
+        help="Offers used for the quadratic scanning baseline (default: %(default)s)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="(default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="(default: %(default)s)")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    rng = random.Random(args.seed)
+    seeds = _seed_links()
+    unparsed = [link for link in seeds if offer_id(link) is None]
+    print(f"config/urls.yaml: {len(seeds)} links, {len(unparsed)} without an offer id")
+
+    consult, mail = _corpus(args.offers, args.mail_share, rng)
+    expected = int(args.offers * args.mail_share)
+    print(f"Corpus: {len(consult)} consult links, {len(mail)} mails (~{expected} joinable)")
+    print(f"Index report: {_build_report(consult, mail)}")
+    for name, func in (("exact url", _exact), ("offer index", _indexed)):
+        elapsed, matched = _time(func, consult, mail, args.repeat)
+        print(
+            f"{name:>12}: {elapsed:.3f}s, {matched} matched "
+            f"({len(consult) / elapsed:,.0f} links/s)"
+        )
+
+    small_consult, small_mail = _corpus(args.scan_sample, args.mail_share, random.Random(args.seed))
+    for name, func in (("scan", _scan), ("offer index", _indexed)):
+        elapsed, matched = _time(func, small_consult, small_mail, 1)
+        print(
+            f"{name:>12}: {elapsed:.3f}s on {len(small_consult)} links, {matched} matched "
+            f"({len(small_consult) / elapsed:,.0f} links/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark saving scraped offers: the in-memory save_offers_data vs streaming through OfferSink."""
+
+import argparse
+import csv
+import json
+import random
+import tempfile
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+from ministerio_audit.storage import OfferSink, flatten_row
+
+REQUISITOS = ["Estudios mínimos", "Experiencia mínima", "Conocimientos necesarios", "Idiomas", "Requisitos mínimos"]
+
+
+def save_in_memory(offers_data, output_dir):
+    """Reference implementation, as save_offers_data was in selenium/scrape.py."""
+    json_path = output_dir / "offers.json"
+    csv_path = output_dir / "offers.csv"
+    with json_path.open("w", encoding="utf-8") as f:
+        json.dump(offers_data, f, ensure_ascii=False, indent=2)
+    flattened_rows = [flatten_row(item) for item in offers_data]
+    fieldnames = sorted({key for row in flattened_rows for key in row.keys()})
+    with csv_path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in flattened_rows:
+            writer.writerow({key: row.get(key) for key in fieldnames})
+    return json_path, csv_path
+
+
+def _offers(count, rng):
+    for n in range(count):
+        yield {
+            "title": f"Auxiliar administrativo/a {n}",
+            "company_name": f"Empresa {rng.randint(1, 300)}",
+            "rating_company": "",
+            "details": ["Barcelona", "Presencial", "Publicada hace 2d"],
+            "publicada": "Publicada hace 2d",
+            "requisitos": {key: "Valor " * rng.randint(1, 8) for key in rng.sample(REQUISITOS, rng.randint(1, 5))},
+            "descripcion": "Descripción de la oferta. " * rng.randint(20, 80),
+            "condiciones": {"Salario": "18.000€ - 21.000€ Bruto/año", "Contrato": "Indefinido"},
+            "inscritos": f"{rng.randint(1, 400)} inscritos",
+            "link": f"https://www.infojobs.net/barcelona/oferta/of-i{n:030x}",
+            "form_text": "Carta de presentación",
+        }
+
+
+def _run(func):
+    tracemalloc.start()
+    start = perf_counter()
+    paths = func()
+    elapsed = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return paths, elapsed, peak
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--offers", type=int, default=20000, help="(default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="(default: %(default)s)")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        def in_memory():
+            # the crawl held every offer until the end
+            offers = list(_offers(args.offers, random.Random(args.seed)))
+            return save_in_memory(offers, tmp)
+
+        def streaming():
+            with OfferSink(tmp, name="offers_sink", fsync_every=4096) as sink:
+                sink.extend(_offers(args.offers, random.Random(args.seed)))
+            return sink.finalize()
+
+        for label, func in (("in memory", in_memory), ("OfferSink", streaming)):
+            paths, elapsed, peak = _run(func)
+            sizes = ", ".join(f"{path.name} {path.stat().st_size / 1e6:.1f} MB" for path in paths)
+            print(f"{label:>10}: {elapsed:6.2f}s, peak {peak / 1e6:7.1f} MB | {sizes}")
+
+
+if __name__ == "__main__":
+    main()
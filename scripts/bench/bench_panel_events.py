@@ -0,0 +1,109 @@
+"""Benchmark the panel event flattening: explode().apply(pd.Series) vs explode_events."""
+
+import argparse
+import random
+from datetime import datetime, timedelta
+from time import perf_counter
+
+import pandas as pd
+
+from ministerio_audit.analysis import explode_events
+
+EVENT_TEXTS = [
+    "Inscrito",
+    "CV leído",
+    "En proceso",
+    "Finalista",
+    "Descartado",
+]
+
+
+def explode_apply(df):
+    """Reference implementation, as it was in scripts/panel/build_panel.py."""
+    df_events = (
+        df["events"]
+        .explode(ignore_index=False)
+        .apply(pd.Series)
+        .rename(columns={"text": "event", "time": "event_time"})
+    )
+    return pd.concat([df.drop(columns="events"), df_events], axis=1)
+
+
+def _records(applications, max_events, empty_share, rng):
+    start = datetime(2024, 1, 8, 9, 0)
+    records = []
+    for n in range(applications):
+        events = []
+        if rng.random() >= empty_share:
+            when = start + timedelta(hours=rng.randint(0, 24 * 300))
+            for text in EVENT_TEXTS[: rng.randint(1, max_events)]:
+                events.append({"text": text, "time": when.strftime("%d/%m/%Y %H:%M")})
+                when += timedelta(hours=rng.randint(1, 240))
+        records.append(
+            {
+                "cv_id": f"cv{n % 16 + 1:02d}",
+                "url": f"https://www.infojobs.net/candidate/application/{n}",
+                "timestamp": "20240601_120000",
+                "job_title": f"Oferta {n}",
+                "offer_link": f"https://www.infojobs.net/ciudad/oferta/of-i{n:030x}",
+                "mail_confirmed": n % 3 == 0,
+                "events": events,
+            }
+        )
+    return pd.DataFrame(records)
+
+
+def _same_events(reference, flat):
+    ref = reference[["event", "event_time"]].reset_index(drop=True)
+    ref = ref.astype(object).where(ref.notna(), None)
+    new = flat[["event", "event_time"]].astype(object)
+    new = new.where(new.notna(), None)
+    return ref.equals(new)
+
+
+def _time(func, df, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        out = func(df)
+        best = min(best, perf_counter() - start)
+    return best, out
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--applications", type=int, default=5000, help="(default: %(default)s)")
+    parser.add_argument(
+        "--max-events",
+        type=int,
+        default=len(EVENT_TEXTS),
+        help="Events per application, at most (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--empty-share",
+        type=float,
+        default=0.1,
+        help="Share of applications without events (default: %(default)s)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="(default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="(default: %(default)s)")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    df = _records(args.applications, args.max_events, args.empty_share, random.Random(args.seed))
+    events = int(df["events"].map(len).sum())
+    print(f"Panel: {len(df)} applications, {events} events")
+
+    old_time, reference = _time(explode_apply, df, args.repeat)
+    new_time, flat = _time(explode_events, df, args.repeat)
+    print(f"Same event rows as explode().apply: {_same_events(reference, flat)}")
+    print(f"Unparsed event times: {int(flat['event_at'].isna().sum() - flat['event_time'].isna().sum())}")
+    for name, elapsed in (("explode+apply", old_time), ("explode_events", new_time)):
+        print(f"{name:>14}: {elapsed:.3f}s ({events / elapsed:,.0f} events/s)")
+    print(f"Speed-up: {old_time / new_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
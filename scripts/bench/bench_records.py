@@ -0,0 +1,103 @@
+"""Benchmark consult records held as dicts vs slotted, interned ConsultRecord objects."""
+
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+from time import perf_counter
+
+import pandas as pd
+
+from ministerio_audit.analysis import explode_events
+from ministerio_audit.parsing import ConsultRecord, from_columns, to_columns
+
+EVENT_TEXTS = ["Inscrito", "CV leído", "En proceso", "Finalista", "Descartado"]
+COMPANIES = [f"Empresa {n}" for n in range(300)]
+
+
+def _lines(applications, cvs, rng):
+    """JSON lines as consult_offers writes them."""
+    lines = []
+    for n in range(applications):
+        events = [
+            {"text": text, "time": f"{rng.randint(1, 28):02d}/0{rng.randint(1, 9)}/2024 10:00"}
+            for text in EVENT_TEXTS[: rng.randint(1, len(EVENT_TEXTS))]
+        ]
+        company = rng.choice(COMPANIES)
+        record = {
+            "cv_id": f"cv{n % cvs + 1:02d}",
+            "url": f"https://www.infojobs.net/candidate/application/{n}",
+            "timestamp": "20240601_120000",
+            "job_title": f"Oferta {n % 500}",
+            "offer_link": f"https://www.infojobs.net/barcelona/oferta/of-i{n:030x}",
+            "job_subtitle": company,
+            "job_subtitle_href": f"https://www.infojobs.net/{company.lower().replace(' ', '-')}",
+            "job_details": ["Barcelona", "Presencial"],
+            "next_div": "Inscrito",
+            "all_job_desc": "Descripción de la oferta",
+            "events": events,
+        }
+        lines.append(json.dumps(record, ensure_ascii=False))
+    return lines
+
+
+def _measure(build):
+    """Seconds to build, then bytes allocated by a second, traced build."""
+    gc.collect()
+    start = perf_counter()
+    build()
+    elapsed = perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    data = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, elapsed, size
+
+
+def _time(func):
+    start = perf_counter()
+    result = func()
+    return result, perf_counter() - start
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--applications", type=int, default=100000, help="(default: %(default)s)")
+    parser.add_argument("--cvs", type=int, default=16, help="(default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="(default: %(default)s)")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    lines = _lines(args.applications, args.cvs, random.Random(args.seed))
+    print(f"{len(lines)} consult records")
+
+    dicts, dict_time, dict_size = _measure(lambda: [json.loads(line) for line in lines])
+    records, record_time, record_size = _measure(
+        lambda: [ConsultRecord.from_dict(json.loads(line)) for line in lines]
+    )
+    print(f"{'load':>22}: dicts {dict_time:.2f}s {dict_size / 1e6:7.1f} MB | "
+          f"records {record_time:.2f}s {record_size / 1e6:7.1f} MB")
+
+    frame, frame_dicts = _time(lambda: pd.DataFrame(dicts))
+    _, explode_dicts = _time(lambda: explode_events(frame))
+
+    def records_frame():
+        columns = to_columns(records, ConsultRecord, plain=False)
+        columns.pop("extra")
+        return pd.DataFrame(columns)
+
+    frame, frame_records = _time(records_frame)
+    _, explode_records = _time(lambda: explode_events(frame))
+    print(f"{'to DataFrame':>22}: dicts {frame_dicts:.2f}s | records {frame_records:.2f}s")
+    print(f"{'explode_events':>22}: dicts {explode_dicts:.2f}s | records {explode_records:.2f}s")
+
+    back, round_trip = _time(lambda: from_columns(ConsultRecord, to_columns(records, ConsultRecord)))
+    print(f"{'columns round trip':>22}: {round_trip:.2f}s, identical: {back == records}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Run the apply/consult flows end-to-end against the local stand-in site.
+
+Each flow runs as a subprocess with headless Chrome, in a throwaway sandbox
+(accounts, CVs, letters, offers, runs directory), with INFOJOBS_BASE_URL
+pointing at the stand-in. The report shows wall time per flow and, per page
+kind, the server time and the browser time spent on the page until its next
+request (waits, parsing, pacing), followed by the per-step metrics the flow
+recorded itself.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import yaml
+
+from ministerio_audit.config import OFFERS_DIR, PROJECT_ROOT
+from ministerio_audit.selenium.pacing import PROFILES
+from standin import StandInSite, request_summary
+
+SCRIPTS = PROJECT_ROOT / "scripts" / "selenium"
+FLOWS = {
+    "apply": SCRIPTS / "apply_offers.py",
+    "consult": SCRIPTS / "consult_offers.py",
+}
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--flows",
+        default="apply,consult",
+        help="Comma-separated flows to run in order (default: %(default)s)",
+    )
+    parser.add_argument("--cvs", type=int, default=2, help="Accounts to run (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=1, help="apply_offers --workers (default: %(default)s)")
+    parser.add_argument(
+        "--pacing",
+        choices=sorted(PROFILES),
+        default="fast",
+        help="Pacing profile of the flows (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--latency",
+        default="0.05,0.2",
+        help="min,max seconds added to every request (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--failure-rate",
+        type=float,
+        default=0.0,
+        help="Share of GET requests answered with 503 (default: %(default)s)",
+    )
+    parser.add_argument("--incremental", action="store_true", help="Run consult with --incremental")
+    parser.add_argument("--seed", type=int, default=0, help="(default: %(default)s)")
+    parser.add_argument("--timeout", type=int, default=1800, help="Seconds per flow (default: %(default)s)")
+    parser.add_argument("--workdir", type=Path, default=None, help="Sandbox directory (default: a temp dir)")
+    parser.add_argument("--output", type=Path, default=None, help="Write the report as JSON")
+    return parser.parse_args()
+
+
+def _prepare_sandbox(root: Path, cv_ids):
+    offers_dir = root / "data" / "raw" / "offers"
+    offers_dir.mkdir(parents=True, exist_ok=True)
+    for path in OFFERS_DIR.glob("*.yaml"):
+        shutil.copy(path, offers_dir / path.name)
+    cv_dir = root / "data" / "raw" / "cv"
+    (cv_dir / "pdf").mkdir(parents=True, exist_ok=True)
+    letters = {}
+    for cv_id in cv_ids:
+        (cv_dir / "pdf" / f"{cv_id}.pdf").write_bytes(b"%PDF-1.4\n% stand-in CV\n")
+        letters[cv_id] = f"Carta de presentación de {cv_id}."
+    with (cv_dir / "letters.yaml").open("w", encoding="utf-8") as f:
+        yaml.safe_dump(letters, f, allow_unicode=True)
+    accounts = [
+        {"id": cv_id, "infojobs_email": f"{cv_id}@standin.test", "infojobs_password": f"pw-{cv_id}"}
+        for cv_id in cv_ids
+    ]
+    (root / "secrets").mkdir(exist_ok=True)
+    with (root / "secrets" / "passwords.yaml").open("w", encoding="utf-8") as f:
+        yaml.safe_dump({"accounts": accounts}, f)
+    (root / "runs" / "selenium").mkdir(parents=True, exist_ok=True)
+    offer_ids = sorted(path.stem for path in offers_dir.glob("*.yaml"))
+    return {a["infojobs_email"]: a["infojobs_password"] for a in accounts}, offer_ids
+
+
+def _flow_args(flow, args, cv_ids, offer_ids):
+    common = ["--cvs", ",".join(cv_ids), "--pacing", args.pacing, "--headless"]
+    if flow == "apply":
+        return common + ["--offers", ",".join(offer_ids), "--workers", str(args.workers)]
+    return common + (["--incremental"] if args.incremental else [])
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _report_steps(requests):
+    steps = {}
+    for kind, stats in request_summary(requests).items():
+        server, page = stats["server_seconds"], stats["page_seconds"]
+        steps[kind] = {
+            "requests": stats["requests"],
+            "server_mean": sum(server) / len(server),
+            "page_p50": _percentile(page, 0.5),
+            "page_p95": _percentile(page, 0.95),
+            "page_total": sum(page),
+        }
+    return steps
+
+
+def _step_metrics(metrics_dir: Path, seen):
+    """Summary written by the flow that just ran (see selenium.metrics)."""
+    new = [p for p in metrics_dir.glob("*.summary.json") if p not in seen]
+    if not new:
+        return {}
+    with max(new, key=lambda p: p.stat().st_mtime).open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _fmt(value):
+    return f"{value:8.2f}" if value is not None else f"{'-':>8}"
+
+
+def _print_report(flow, result):
+    print(f"\n{flow}: exit {result['returncode']}, {result['seconds']:.1f}s wall, "
+          f"{result['requests']} requests")
+    print(f"{'page':>14} {'reqs':>5} {'server':>8} {'p50':>8} {'p95':>8} {'total':>9}")
+    for kind, step in sorted(result["steps"].items(), key=lambda kv: -kv[1]["page_total"]):
+        print(
+            f"{kind:>14} {step['requests']:>5} {_fmt(step['server_mean'])} "
+            f"{_fmt(step['page_p50'])} {_fmt(step['page_p95'])} {step['page_total']:9.1f}"
+        )
+    if result["metrics"]:
+        print(f"\n{'step':>14} {'n':>5} {'wall':>8} {'wait':>8} {'pause':>8} {'rpc':>6} {'retries':>7}")
+        for name, step in result["metrics"].items():
+            print(
+                f"{name:>14} {step['count']:>5} {step['wall_seconds']:8.1f} "
+                f"{step['wait_seconds']:8.1f} {step['pause_seconds']:8.1f} "
+                f"{step['rpc']:>6} {step['retries']:>7}"
+            )
+
+
+def main():
+    args = _parse_args()
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="standin_bench_"))
+    cv_ids = [f"cv{n:02d}" for n in range(1, args.cvs + 1)]
+    accounts, offer_ids = _prepare_sandbox(workdir, cv_ids)
+    low, high = (float(v) for v in args.latency.split(","))
+
+    site = StandInSite(
+        offers=None,
+        accounts=accounts,
+        latency=(low, high),
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    env = dict(
+        os.environ,
+        INFOJOBS_BASE_URL=site.base_url,
+        DATA_DIR=str(workdir / "data"),
+        RUNS_DIR=str(workdir / "runs"),
+        SECRETS_DIR=str(workdir / "secrets"),
+        SECRETS_PATH=str(workdir / "secrets" / "passwords.yaml"),
+        PACING_PROFILE=args.pacing,
+    )
+    metrics_dir = workdir / "runs" / "metrics"
+    report = {"config": {k: str(v) for k, v in vars(args).items()}, "flows": {}}
+    print(f"Stand-in site {site.base_url}, sandbox {workdir}")
+    with site:
+        for flow in [f.strip() for f in args.flows.split(",") if f.strip()]:
+            first = len(site.requests)
+            seen = set(metrics_dir.glob("*.summary.json"))
+            start = perf_counter()
+            proc = subprocess.run(
+                [sys.executable, str(FLOWS[flow]), *_flow_args(flow, args, cv_ids, offer_ids)],
+                env=env,
+                cwd=PROJECT_ROOT,
+                timeout=args.timeout,
+            )
+            requests = site.requests[first:]
+            result = {
+                "returncode": proc.returncode,
+                "seconds": perf_counter() - start,
+                "requests": len(requests),
+                "steps": _report_steps(requests),
+                "metrics": _step_metrics(metrics_dir, seen),
+            }
+            report["flows"][flow] = result
+            _print_report(flow, result)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with args.output.open("w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Serve the stand-in InfoJobs site until interrupted, for manual Selenium runs."""
+
+import argparse
+import logging
+from time import sleep
+
+from standin import StandInSite
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765, help="(default: %(default)s)")
+    parser.add_argument(
+        "--latency",
+        default="0,0",
+        help="min,max seconds added to every request (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--failure-rate",
+        type=float,
+        default=0.0,
+        help="Share of GET requests answered with 503 (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--applications",
+        type=int,
+        default=3,
+        help="Applications each account starts with (default: %(default)s)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="(default: %(default)s)")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    logging.basicConfig(level=logging.DEBUG, format="%(asctime)s %(message)s")
+    low, high = (float(v) for v in args.latency.split(","))
+    site = StandInSite(
+        applications_per_user=args.applications,
+        latency=(low, high),
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+        port=args.port,
+    )
+    with site:
+        print(f"export INFOJOBS_BASE_URL={site.base_url}")
+        try:
+            while True:
+                sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
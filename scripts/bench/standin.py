@@ -0,0 +1,551 @@
+"""Local stand-in for the InfoJobs pages the Selenium flows use.
+
+``StandInSite`` serves login, search results, offer detail, apply form and
+"Mis candidaturas" pages with the ids and classes ``actions`` and ``scrape``
+look for. Offers come from the YAML files in ``OFFERS_DIR`` plus synthetic
+ones for search results. Every request can be delayed (``latency``) or
+failed with a 503 (``failure_rate``), and is recorded in ``requests`` for
+benchmarks. Point the flows at it with ``INFOJOBS_BASE_URL=<site.base_url>``.
+"""
+
+from __future__ import annotations
+
+import html
+import json
+import logging
+import random
+import re
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import yaml
+
+from ministerio_audit.config import OFFERS_DIR
+
+logger = logging.getLogger(__name__)
+
+SESSION_COOKIE = "ij_session"
+CONSENT_COOKIE = "didomi_token"
+EVENT_TEXTS = [
+    "CV leído",
+    "En proceso",
+    "Finalista",
+    "Descartado",
+]
+_OFFER_CODE = re.compile(r"/of-i([0-9a-f]+)")
+
+
+@dataclass
+class StandInOffer:
+    code: str
+    title: str
+    company: str
+    city: str = "Barcelona"
+    fieldsets: list = field(default_factory=list)
+
+    @property
+    def path(self) -> str:
+        slug = re.sub(r"[^a-z0-9]+", "-", self.title.lower()).strip("-")
+        return f"/{self.city.lower()}/{slug}/of-i{self.code}"
+
+
+@dataclass
+class StandInApplication:
+    number: int
+    offer: StandInOffer
+    events: list = field(default_factory=list)
+
+
+def load_offer_specs(offers_dir: Path = OFFERS_DIR) -> list[StandInOffer]:
+    """Stand-in offers for the recorded offer YAMLs, keeping their URLs and ids."""
+    offers = []
+    for path in sorted(Path(offers_dir).glob("*.yaml")):
+        with path.open(encoding="utf-8") as f:
+            spec = yaml.safe_load(f) or {}
+        match = _OFFER_CODE.search(spec.get("url", ""))
+        if not match:
+            continue
+        offers.append(
+            StandInOffer(
+                code=match.group(1),
+                title=spec.get("alias") or spec.get("offer_id", path.stem),
+                company=f"Empresa {spec.get('alias', path.stem)}",
+                fieldsets=spec.get("fieldsets") or [],
+            )
+        )
+    return offers
+
+
+def synthetic_offers(count: int, rng: random.Random) -> list[StandInOffer]:
+    titles = ["Mozo/a de almacén", "Auxiliar administrativo/a", "Preparador/a de pedidos"]
+    return [
+        StandInOffer(
+            code="%030x" % rng.getrandbits(120),
+            title=f"{rng.choice(titles)} {n}",
+            company=f"Empresa {n}",
+        )
+        for n in range(count)
+    ]
+
+
+def _e(value) -> str:
+    return html.escape(str(value), quote=True)
+
+
+_HEAD = """<!DOCTYPE html><html lang="es"><head><meta charset="utf-8"><title>{title}</title>
+<style>.hidden{{display:none}}</style></head><body>"""
+
+_COOKIE_BANNER = """<div id="didomi-host"><button id="didomi-notice-agree-button"
+onclick="document.cookie='didomi_token=1; path=/';this.parentNode.remove()">Aceptar</button></div>"""
+
+_LOGIN_FORM = """<button id="candidate_login" type="button"
+onclick="document.getElementById('login-box').classList.remove('hidden')">Acceso candidatos</button>
+<div id="login-box" class="hidden"><form method="post" action="/login">
+<input type="email" name="email"><input type="password" name="password">
+<button type="submit"><span>Iniciar sesión</span></button></form></div>"""
+
+_SEARCH_FORM = """<form aria-label="Buscar ofertas" method="get" action="/ofertas-trabajo" id="search">
+<input id="keyword-autocomplete" name="keyword">
+<input id="location-autocomplete" name="location"
+ oninput="document.getElementById('loc-list').classList.remove('hidden')">
+<ul id="loc-list" class="hidden"><li aria-label="Barcelona, ciudad"
+ onclick="document.getElementById('loc-list').classList.add('hidden')">Barcelona</li></ul>
+<div class="ij-Box ij-RadiusSelector--desktop">Radio 30 km</div>
+<button type="submit" class="ij-SubmitSearchButton">Buscar</button></form>"""
+
+
+def _header(user) -> str:
+    if user is None:
+        return "<header></header>"
+    return (
+        "<header><nav>"
+        '<a id="menu_tab_26" href="/ofertas-trabajo">Empleos</a>'
+        '<a class="ij-MainMenu-link trackingMainMenuMyApplication" '
+        'href="/candidate/applications">Mis candidaturas</a>'
+        '<div class="ij-HeaderDesktop-navbar-avatar" '
+        "onclick=\"document.getElementById('user-menu').classList.remove('hidden')\">"
+        f"{_e(user[:1].upper())}</div>"
+        '<div id="user-menu" class="hidden">'
+        '<a data-e2e="mainMenuSignOut" href="/logout">Cerrar sesión</a></div>'
+        "</nav></header>"
+    )
+
+
+def _render_fieldset(fieldset) -> str:
+    parts = []
+    for item in fieldset.get("inputs", []):
+        item_id, name = _e(item.get("id", "")), _e(item.get("name", ""))
+        if item.get("type") == "textarea":
+            parts.append(f'<textarea id="{item_id}" name="{name}"></textarea>')
+            continue
+        # the recorded answer plus one alternative
+        choices = [("", item.get("label") or "SI"), ("_no", "NO")]
+        for n, (suffix, label) in enumerate(choices):
+            parts.append(
+                f'<input type="radio" id="{item_id}{suffix}" name="{name}" value="{n}">'
+                f'<label for="{item_id}{suffix}">{_e(label)}</label>'
+            )
+    return (
+        f'<fieldset><legend>{_e(fieldset.get("question", ""))}</legend>'
+        f'{"".join(parts)}</fieldset>'
+    )
+
+
+class StandInSite:
+    """Threaded HTTP server with the state of a few candidate accounts."""
+
+    def __init__(
+        self,
+        offers=None,
+        accounts=None,
+        search_results=40,
+        page_size=20,
+        applications_per_user=0,
+        event_rate=0.2,
+        latency=(0.0, 0.0),
+        failure_rate=0.0,
+        seed=0,
+        host="127.0.0.1",
+        port=0,
+    ):
+        self.rng = random.Random(seed)
+        recorded = load_offer_specs() if offers is None else list(offers)
+        self.offers = {offer.code: offer for offer in recorded}
+        self.results = synthetic_offers(search_results, self.rng) + recorded
+        self.offers.update((offer.code, offer) for offer in self.results)
+        # email -> password; None accepts any login
+        self.accounts = accounts
+        self.page_size = page_size
+        self.applications_per_user = applications_per_user
+        self.event_rate = event_rate
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.sessions = {}
+        self.applications = {}
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _handler_for(self))
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="standin-site", daemon=True
+        )
+        self._thread.start()
+        logger.info("Stand-in InfoJobs site on %s", self.base_url)
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # state
+
+    def _user_applications(self, user) -> list[StandInApplication]:
+        apps = self.applications.get(user)
+        if apps is None:
+            apps = self.applications[user] = []
+            for offer in self.rng.sample(
+                self.results, min(self.applications_per_user, len(self.results))
+            ):
+                self._apply(user, offer)
+        return apps
+
+    def _apply(self, user, offer) -> StandInApplication:
+        apps = self.applications.get(user)
+        if apps is None:
+            apps = self._user_applications(user)
+        app = StandInApplication(len(apps) + 1, offer)
+        app.events.append(("Inscrito", datetime.now().strftime("%d/%m/%Y %H:%M")))
+        apps.append(app)
+        return app
+
+    def _advance(self, apps):
+        """New events appear between visits so incremental consults see changes."""
+        for app in apps:
+            if len(app.events) <= len(EVENT_TEXTS) and self.rng.random() < self.event_rate:
+                text = EVENT_TEXTS[len(app.events) - 1]
+                app.events.append((text, datetime.now().strftime("%d/%m/%Y %H:%M")))
+
+    def _delay(self) -> float:
+        with self._lock:
+            return self.rng.uniform(*self.latency)
+
+    def _should_fail(self) -> bool:
+        if not self.failure_rate:
+            return False
+        with self._lock:
+            return self.rng.random() < self.failure_rate
+
+    # pages
+
+    def page_main(self, user, query, consent):
+        body = _header(user)
+        if not consent:
+            body += _COOKIE_BANNER
+        body += _SEARCH_FORM if user else _LOGIN_FORM
+        return "main", body
+
+    def page_search(self, user, query, consent):
+        if "keyword" not in query:
+            return "search", _header(user) + _SEARCH_FORM
+        page = int(query.get("page", ["1"])[0])
+        start = (page - 1) * self.page_size
+        items = "".join(
+            '<li class="ij-List-item sui-PrimitiveLinkBox"><div>'
+            f'<h2 id="job-title-{start + n}"><a href="{_e(offer.path)}">{_e(offer.title)}</a></h2>'
+            f"<p>{_e(offer.company)} · {_e(offer.city)}</p></div></li>"
+            for n, offer in enumerate(self.results[start : start + self.page_size])
+        )
+        pagination = ""
+        if start + self.page_size < len(self.results):
+            next_query = {key: values[0] for key, values in query.items()}
+            next_query["page"] = page + 1
+            pagination = (
+                '<ul><li class="sui-MoleculePagination-item"><button '
+                f"onclick=\"location.href='/ofertas-trabajo?{_e(urlencode(next_query))}'\">"
+                "<span>Siguiente</span></button></li></ul>"
+            )
+        return "results", (
+            _header(user)
+            + '<nav class="ij-SidebarFilter">Filtros</nav>'
+            + f"<ul>{items}</ul>{pagination}"
+        )
+
+    def page_offer(self, user, offer):
+        applied = user is not None and any(
+            app.offer.code == offer.code for app in self._user_applications(user)
+        )
+        notice = "<p>Ya te has inscrito en esta oferta</p>" if applied else ""
+        return "offer", (
+            _header(user)
+            + '<article class="ij-Box ij-OfferDetailHeader">'
+            + f'<div class="ij-OfferDetailHeader-title"><h1>{_e(offer.title)}</h1></div>'
+            + f'<div class="ij-OfferDetailHeader-companyLogo-companyName"><a>{_e(offer.company)}</a></div>'
+            + '<p class="sui-MoleculeRating-label">4,0</p>'
+            + '<div class="ij-OfferDetailHeader-detailsList">'
+            + f'<div class="ij-OfferDetailHeader-detailsList-item">{_e(offer.city)}</div>'
+            + '<div class="ij-OfferDetailHeader-detailsList-item">Presencial</div></div>'
+            + '<span data-testid="sincedate-tag">Publicada hace 2d</span></article>'
+            + notice
+            + "<h3>Requisitos</h3><dl><dt>Estudios mínimos</dt><dd>ESO</dd>"
+            + "<dt>Experiencia mínima</dt><dd>Al menos 1 año</dd></dl>"
+            + "<h3>Descripción</h3><div><p>Funciones del puesto.</p><p>Horario de mañana.</p></div>"
+            + "<dl><dt>Tipo de industria</dt><dd><a>Logística</a></dd>"
+            + "<dt>Salario</dt><dd>18.000€ - 20.000€ Bruto/año</dd></dl>"
+            + f"<h3>{int(offer.code[:4], 16) % 200} inscritos a esta oferta</h3>"
+            + '<div data-test="apply-button-footer">'
+            + f"<button onclick=\"location.href='/candidate/apply/{offer.code}'\">"
+            + "Inscribirme</button></div>"
+        )
+
+    def page_apply(self, user, offer):
+        fieldsets = "".join(_render_fieldset(fs) for fs in offer.fieldsets)
+        return "form", (
+            _header(user)
+            + f"<h3>Datos de la oferta</h3><dl><dt>Puesto</dt><dd>{_e(offer.title)}</dd>"
+            + f"<dt>Ciudad</dt><dd>{_e(offer.city)}</dd></dl>"
+            + f'<form id="myForm" method="post" action="/candidate/apply/{offer.code}">'
+            + fieldsets
+            + '<input type="file" name="cv" onchange="var s=document.getElementById('
+            + "'cv-name');s.textContent=this.files[0].name;s.classList.remove('hidden')\">"
+            + '<span class="ij-FilePreview-name hidden" id="cv-name"></span>'
+            + '<input type="radio" id="opcionCarta_incluir" name="carta" '
+            + "onclick=\"document.getElementById('texto_carta_incluir').classList.remove('hidden')\">"
+            + '<textarea id="texto_carta_incluir" name="texto_carta" class="hidden"></textarea>'
+            + '<button id="botonEnviar" type="submit">Inscribirme</button></form>'
+        )
+
+    def page_applied(self, user, offer):
+        return "applied", _header(user) + f"<h1>Te has inscrito en {_e(offer.title)}</h1>"
+
+    def page_applications(self, user):
+        apps = self._user_applications(user)
+        self._advance(apps)
+        items = "".join(
+            f'<li id="inscription-{app.number}"><div><h2>'
+            f'<a href="/candidate/applications/{app.number}">{_e(app.offer.title)}</a>'
+            f"</h2></div><p>{_e(app.events[-1][0])}</p></li>"
+            for app in reversed(apps)
+        )
+        return "applications", _header(user) + f"<ul>{items}</ul>"
+
+    def page_account(self, user):
+        return "account", _header(user) + f'<section class="ij-CvContact"><p>{_e(user)}</p></section>'
+
+    def page_application(self, user, app):
+        events = "".join(
+            f'<li id="event-{n}"><p id="event-text">{_e(text)}</p><time>{_e(when)}</time></li>'
+            for n, (text, when) in enumerate(reversed(app.events), start=1)
+        )
+        return "application", (
+            _header(user)
+            + '<div class="job-list"><div>'
+            + f'<h2 class="job-list-title"><a href="{_e(app.offer.path)}">{_e(app.offer.title)}</a></h2>'
+            + f"<ul><li>{_e(app.offer.city)}</li><li>Jornada completa</li></ul></div>"
+            + f"<div><p>Estado: {_e(app.events[-1][0])}</p></div>"
+            + f'<h3 class="job-list-subtitle"><a href="/empresa/{app.offer.code[:8]}">'
+            + f"{_e(app.offer.company)}</a></h3>"
+            + f"<ol>{events}</ol></div>"
+        )
+
+
+def _handler_for(site: StandInSite):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            logger.debug("%s %s", self.address_string(), fmt % args)
+
+        def _cookies(self):
+            cookie = SimpleCookie(self.headers.get("Cookie", ""))
+            return {key: morsel.value for key, morsel in cookie.items()}
+
+        def _send(self, status, body="", headers=()):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _redirect(self, location, headers=()):
+            self._send(303, "", (("Location", location), *headers))
+
+        def _page(self, kind_body, title="InfoJobs"):
+            kind, body = kind_body
+            self._kind = kind
+            self._send(200, _HEAD.format(title=_e(title)) + body + "</body></html>")
+
+        def _handle(self, method):
+            started = time.perf_counter()
+            self._kind = "other"
+            status = 200
+            try:
+                time.sleep(site._delay())
+                if method == "GET" and site._should_fail():
+                    self._kind = "failure"
+                    status = 503
+                    self._send(503, "<html><body><h1>Servicio no disponible</h1></body></html>")
+                    return
+                status = self._route(method) or 200
+            finally:
+                with site._lock:
+                    site.requests.append(
+                        {
+                            "time": time.time(),
+                            "method": method,
+                            "path": self.path,
+                            "kind": self._kind,
+                            "status": status,
+                            "seconds": time.perf_counter() - started,
+                            "session": self._cookies().get(SESSION_COOKIE),
+                        }
+                    )
+
+        def _route(self, method):
+            url = urlsplit(self.path)
+            path, query = url.path, parse_qs(url.query)
+            cookies = self._cookies()
+            user = site.sessions.get(cookies.get(SESSION_COOKIE))
+            consent = CONSENT_COOKIE in cookies
+
+            if method == "POST" and path == "/login":
+                form = self._form()
+                email = form.get("email", "")
+                if site.accounts is not None and site.accounts.get(email) != form.get("password"):
+                    self._kind = "login_failed"
+                    self._redirect("/")
+                    return 303
+                token = secrets.token_hex(16)
+                with site._lock:
+                    site.sessions[token] = email
+                self._kind = "login"
+                self._redirect("/", (("Set-Cookie", f"{SESSION_COOKIE}={token}; Path=/"),))
+                return 303
+            if path == "/logout":
+                with site._lock:
+                    site.sessions.pop(cookies.get(SESSION_COOKIE), None)
+                self._kind = "logout"
+                self._redirect("/", (("Set-Cookie", f"{SESSION_COOKIE}=; Path=/; Max-Age=0"),))
+                return 303
+            if path in ("/", "/candidate/candidate-login/candidate-login.xhtml"):
+                self._page(site.page_main(user, query, consent))
+                return 200
+            if path == "/ofertas-trabajo":
+                self._page(site.page_search(user, query, consent))
+                return 200
+            if path.startswith("/candidate/") and user is None:
+                self._kind = "unauthorized"
+                self._redirect("/")
+                return 303
+            if path == "/candidate/cv/view/index.xhtml":
+                self._page(site.page_account(user))
+                return 200
+            if path.startswith("/candidate/apply/"):
+                code = path.split("/")[3]
+                offer = site.offers.get(code)
+                if offer is None:
+                    return self._not_found()
+                if method == "POST":
+                    self._form()
+                    with site._lock:
+                        site._apply(user, offer)
+                    self._kind = "apply"
+                    self._redirect(f"/candidate/apply/{code}/ok")
+                    return 303
+                if path.endswith("/ok"):
+                    self._page(site.page_applied(user, offer))
+                else:
+                    self._page(site.page_apply(user, offer))
+                return 200
+            if path == "/candidate/applications":
+                with site._lock:
+                    page = site.page_applications(user)
+                self._page(page)
+                return 200
+            if path.startswith("/candidate/applications/"):
+                number = path.rsplit("/", 1)[-1]
+                with site._lock:
+                    apps = site._user_applications(user)
+                    if not number.isdigit() or not 0 < int(number) <= len(apps):
+                        return self._not_found()
+                    page = site.page_application(user, apps[int(number) - 1])
+                self._page(page)
+                return 200
+            match = _OFFER_CODE.search(path)
+            if match and match.group(1) in site.offers:
+                with site._lock:
+                    page = site.page_offer(user, site.offers[match.group(1)])
+                self._page(page)
+                return 200
+            return self._not_found()
+
+        def _not_found(self):
+            self._kind = "not_found"
+            self._send(404, "<html><body><h1>No encontrado</h1></body></html>")
+            return 404
+
+        def _form(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length).decode("utf-8", "replace") if length else ""
+            content_type = self.headers.get("Content-Type", "")
+            if content_type.startswith("application/x-www-form-urlencoded"):
+                return {key: values[0] for key, values in parse_qs(raw).items()}
+            return {}
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+    return Handler
+
+
+def request_summary(requests: list[dict]) -> dict:
+    """Per page kind: requests, server seconds and browser time on the page.
+
+    Browser time is the gap until the same session's next request, so it
+    covers waits, parsing and pacing pauses spent on that page.
+    """
+    summary = {}
+    by_session = {}
+    for request in sorted(requests, key=lambda r: r["time"]):
+        by_session.setdefault(request["session"], []).append(request)
+    for session_requests in by_session.values():
+        for current, following in zip(session_requests, session_requests[1:] + [None]):
+            stats = summary.setdefault(
+                current["kind"], {"requests": 0, "server_seconds": [], "page_seconds": []}
+            )
+            stats["requests"] += 1
+            stats["server_seconds"].append(current["seconds"])
+            if following is not None:
+                stats["page_seconds"].append(following["time"] - current["time"])
+    return summary
+
+
+def dump_requests(requests: list[dict], path: Path):
+    with Path(path).open("w", encoding="utf-8") as f:
+        for request in requests:
+            f.write(json.dumps(request) + "\n")
@@ -0,0 +1,95 @@
+"""Rebuild the panels incrementally: only stages whose inputs changed run."""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from ministerio_audit.analysis.build import STATE_DIR, Build, panel_stages
+from ministerio_audit.analysis.panel import CONSULT_DIR, MAILROOT, PANEL_DIR
+from ministerio_audit.analysis.traces import TRACES_DIR
+from ministerio_audit.mail import MAIL_INDEX_PATH
+from ministerio_audit.storage import YamlCache
+
+
+def _split_csv_arg(value: str) -> list[str]:
+    if not value:
+        return []
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--stages",
+        default="",
+        help="Comma-separated stages to bring up to date, with their dependencies "
+        "(default: all of mail, consult, traces, panel)",
+    )
+    parser.add_argument(
+        "--force",
+        default="",
+        help="Comma-separated stages to run even if unchanged, or 'all'",
+    )
+    parser.add_argument("--consult-dir", type=Path, default=CONSULT_DIR, help="(default: %(default)s)")
+    parser.add_argument("--traces-dir", type=Path, default=TRACES_DIR, help="(default: %(default)s)")
+    parser.add_argument("--mail-root", type=Path, default=MAILROOT, help="(default: %(default)s)")
+    parser.add_argument("--output-dir", type=Path, default=PANEL_DIR, help="(default: %(default)s)")
+    parser.add_argument("--index", type=Path, default=MAIL_INDEX_PATH, help="(default: %(default)s)")
+    parser.add_argument(
+        "--state-dir",
+        type=Path,
+        default=STATE_DIR,
+        help="Stage fingerprints and intermediate tables (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Stages run at once (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--mail-workers",
+        type=int,
+        default=1,
+        help="Processes used to parse new mail (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse every run YAML again instead of using the parsed-file cache",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(threadName)s %(name)s: %(message)s")
+    cache = None if args.no_cache else YamlCache()
+    stages = panel_stages(
+        consult_dir=args.consult_dir,
+        traces_dir=args.traces_dir,
+        mail_root=args.mail_root,
+        output_dir=args.output_dir,
+        index_path=args.index,
+        state_dir=args.state_dir,
+        mail_workers=args.mail_workers,
+        cache=cache,
+    )
+    build = Build(stages, args.state_dir)
+    results = build.run(
+        _split_csv_arg(args.stages) or None,
+        force=_split_csv_arg(args.force),
+        workers=args.workers,
+    )
+    print(f"{'stage':>8} {'status':>8} {'seconds':>8}")
+    for result in results:
+        print(f"{result.name:>8} {result.status:>8} {result.seconds:8.2f}  {result.error or ''}")
+    if cache is not None:
+        print(f"YAML cache: {cache.summary()}")
+    if any(result.status in ("failed", "blocked") for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
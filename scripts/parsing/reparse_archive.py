@@ -0,0 +1,85 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import os
+from pathlib import Path
+
+from ministerio_audit.config import INTERIM_DIR
+from ministerio_audit.parsing import parse_application, parse_form, parse_offer_detail
+from ministerio_audit.storage import ARCHIVE_DIR, HtmlArchive, RecordWriter
+
+TIMESTAMP = datetime.now().strftime("%Y%m%d_%H%M%S")
+OUTPUT_DIR = INTERIM_DIR / "reparsed"
+
+PARSERS = {
+    "offer": lambda html, url: parse_offer_detail(html),
+    "form": lambda html, url: parse_form(html),
+    "application": lambda html, url: parse_application(html, base_url=url),
+}
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description="Re-run the offline parsers over archived HTML snapshots.",
+    )
+    parser.add_argument("kind", choices=sorted(PARSERS), help="Page kind to re-parse")
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=ARCHIVE_DIR,
+        help="HTML archive directory (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="JSONL output (default: <INTERIM_DIR>/reparsed/<kind>_<timestamp>.jsonl)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Parser processes (default: %(default)s)",
+    )
+    return parser.parse_args()
+
+
+def _parse_snapshot(task):
+    root, kind, digest, url = task
+    try:
+        page = PARSERS[kind](HtmlArchive(root).get(digest), url)
+        return digest, page.to_dict(), None
+    except Exception as exc:
+        return digest, None, repr(exc)
+
+
+def main():
+    args = _parse_args()
+    archive = HtmlArchive(args.root)
+    entries = list(archive.entries(args.kind))
+    # identical snapshots are parsed once and shared by every visit
+    urls = {}
+    for entry in entries:
+        urls.setdefault(entry["digest"], entry.get("url"))
+    digests = list(urls)
+    tasks = [(archive.root, args.kind, digest, urls[digest]) for digest in digests]
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        parsed = {
+            digest: (data, error)
+            for digest, data, error in pool.map(_parse_snapshot, tasks, chunksize=8)
+        }
+
+    output = args.output or OUTPUT_DIR / f"{args.kind}_{TIMESTAMP}.jsonl"
+    failed = sum(1 for _, error in parsed.values() if error)
+    with RecordWriter(output, fsync_every=256) as writer:
+        for entry in entries:
+            data, error = parsed[entry["digest"]]
+            writer.append({**entry, "data": data, "error": error})
+    print(
+        f"Parsed {len(digests)} unique {args.kind} pages ({len(entries)} visits, "
+        f"{failed} failed) into {output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
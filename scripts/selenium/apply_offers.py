@@ -1,36 +1,35 @@
 from __future__ import annotations
 
-from time import sleep
 from datetime import datetime
 import logging
 import argparse
+import os
 
-import undetected_chromedriver as uc
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
 import yaml
 
 from ministerio_audit.config import (
     SECRETS_PATH,
-    CHROMEDRIVER_PATH,
     INTERIM_DIR,
     CV_DIR,
     RUNS_DIR,
     OFFERS_DIR,
 )
-from ministerio_audit.selenium import login_infojobs
+from ministerio_audit.selenium import end_session, ensure_login, metrics
 from ministerio_audit.selenium.actions import (
     TIME_WAIT,
-    TIME_SLEEP,
     applybutton_offer_infojobs,
     load_offer_infojobs,
-    logout_infojobs,
     populate_fieldsets_infojobs,
     populate_optional_infojobs,
 )
+from ministerio_audit.selenium.pacing import DEFAULT_PROFILE, PROFILES, get_policy, pause, set_profile
+from ministerio_audit.selenium.scheduler import AccountHooks, Job, chrome_factory, run_jobs
+from ministerio_audit.storage import FORMATS, write_records
+from ministerio_audit.storage.archive import ARCHIVE_DIR, HtmlArchive
+from ministerio_audit.storage.journal import CampaignJournal
 
 TIMESTAMP = datetime.now().strftime("%Y%m%d_%H%M%S")
 OUTPUT_DIR = (
@@ -60,7 +59,7 @@ DEFAULT_CVS = [
 
 logging.basicConfig(
     level=logging.DEBUG,
-    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    format="%(asctime)s %(levelname)s %(threadName)s %(name)s: %(message)s",
     handlers=[
         logging.FileHandler(LOG_PATH, encoding="utf-8"),
         logging.StreamHandler(),
@@ -88,6 +87,43 @@ def _parse_args():
         default=",".join(DEFAULT_CVS),
         help="Comma-separated CV ids (default: %(default)s)",
     )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="yaml",
+        help="Storage format for application traces (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Browsers running accounts in parallel, one profile per CV "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--logout",
+        action="store_true",
+        help="Log out after each CV instead of keeping the session for the next run",
+    )
+    parser.add_argument(
+        "--pacing",
+        choices=sorted(PROFILES),
+        default=os.environ.get("PACING_PROFILE", DEFAULT_PROFILE),
+        help="Delay profile between browser actions (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help=f"Do not keep raw HTML snapshots of visited pages in {ARCHIVE_DIR}",
+    )
+    parser.add_argument(
+        "--resume",
+        default=None,
+        metavar="RUN",
+        help="Continue run RUN (e.g. apply_infojobs_20240101_120000): skip its "
+        "finished applications and retry failed or pending ones",
+    )
+    parser.add_argument("--headless", action="store_true", help="Run Chrome without a window")
     return parser.parse_args()
 
 
@@ -116,11 +152,64 @@ def _save_run_data(output_dir, cv_id, offer_id, data):
         yaml.safe_dump(data, f, sort_keys=False, allow_unicode=True)
 
 
+def _apply_offer(driver, cv_id, cv_data, offer_id, offer, archive=None):
+    wait = metrics.wait(driver, TIME_WAIT)
+    alias = offer["alias"]
+    url = offer["url"]
+    logger.info("Applying %s with %s", offer_id, cv_id)
+
+    data = {"cv_id": cv_id, "offer_id": offer_id, "alias": alias, "url": url}
+    data["start_time"] = datetime.now().strftime("%Y%m%d_%H%M%S")
+    data["offer_data"] = load_offer_infojobs(driver, url, archive=archive)
+    already_inscribed = bool(
+        driver.find_elements(
+            By.XPATH,
+            "//*[contains(normalize-space(), 'Ya te has inscrito')]",
+        )
+    )
+    data["already_inscribed"] = already_inscribed
+    if already_inscribed:
+        logger.info("Skipping %s; already inscribed", offer_id)
+        return data
+    data["form_text"], data["requirements"] = applybutton_offer_infojobs(
+        driver, archive=archive
+    )
+    wait.until(EC.visibility_of_element_located((By.ID, "myForm")))
+
+    data["form_trace"] = populate_fieldsets_infojobs(
+        driver,
+        offer["fieldsets"],
+        cv_id,
+        offer_id=offer_id,
+    )
+
+    cv_path = CV_DIR / "pdf" / f"{cv_id}.pdf"
+    letter = cv_data["letter"]
+    data["optional_trace"] = populate_optional_infojobs(
+        driver, cv_path, letter
+    )
+
+    with metrics.span("submit"):
+        submit = driver.find_element(By.ID, "botonEnviar")
+        submit.click()
+        wait.until(EC.staleness_of(submit))
+    data["end_time"] = datetime.now().strftime("%Y%m%d_%H%M%S")
+    logger.info("Finished application of offer %s for CV %s" % (offer_id, cv_id))
+    return data
+
+
 def main():
     args = _parse_args()
     offer_ids = _split_csv_arg(args.offers)
     cv_ids = _split_csv_arg(args.cvs)
     userdata, offerdata = _load_config(cv_ids, offer_ids)
+    set_profile(args.pacing)
+    archive = None if args.no_archive else HtmlArchive()
+    output_dir = OUTPUT_DIR.parent / args.resume if args.resume else OUTPUT_DIR
+    if args.resume and not CampaignJournal.exists(args.resume):
+        raise RuntimeError(f"No campaign journal for run {args.resume}")
+    journal = CampaignJournal(output_dir.name)
+    metrics_path = metrics.configure(output_dir.name)
     logger.info(
         "Starting scraping for %s CV at offers %s",
         ", ".join(cv_ids),
@@ -136,65 +225,74 @@ def main():
     if not offerdata:
         raise RuntimeError("No offers configured in offers directory.")
 
-    service = Service(CHROMEDRIVER_PATH)
-    driver = uc.Chrome(service=service, use_subprocess=False)
-    wait = WebDriverWait(driver, TIME_WAIT)
-    try:
-        for cv_id, cv_data in userdata.items():
-            email = cv_data["infojobs_email"]
-            password = cv_data["infojobs_password"]
-            login_infojobs(driver, email, password)
-            sleep(TIME_SLEEP)
-
-            for offer_id, offer in offerdata.items():
-                alias = offer["alias"]
-                url = offer["url"]
-                logger.info("Applying %s with %s", offer_id, cv_id)
-
-                data = {"cv_id": cv_id, "offer_id": offer_id, "alias": alias, "url": url}
-                data["start_time"] = datetime.now().strftime("%Y%m%d_%H%M%S")
-                data["offer_data"] = load_offer_infojobs(driver, url)
-                already_inscribed = bool(
-                    driver.find_elements(
-                        By.XPATH,
-                        "//*[contains(normalize-space(), 'Ya te has inscrito')]",
-                    )
-                )
-                data["already_inscribed"] = already_inscribed
-                if already_inscribed:
-                    logger.info("Skipping %s; already inscribed", offer_id)
-                    _save_run_data(OUTPUT_DIR, cv_id, offer_id, data)
-                    sleep(TIME_SLEEP)
-                    continue
-                data["form_text"], data["requirements"] = applybutton_offer_infojobs(driver)
-                wait.until(EC.visibility_of_element_located((By.ID, "myForm")))
-
-                data["form_trace"] = populate_fieldsets_infojobs(
+    def start(driver, cv_id):
+        cv_data = userdata[cv_id]
+        with metrics.span("session", cv_id=cv_id):
+            ensure_login(driver, cv_id, cv_data["infojobs_email"], cv_data["infojobs_password"])
+            pause("after_login")
+
+    def run(driver, job):
+        journal.start(job.cv_id, job.offer_id)
+        try:
+            with metrics.span("job", cv_id=job.cv_id, offer_id=job.offer_id):
+                data = _apply_offer(
                     driver,
-                    offer["fieldsets"],
-                    cv_id,
-                    offer_id=offer_id,
+                    job.cv_id,
+                    userdata[job.cv_id],
+                    job.offer_id,
+                    offerdata[job.offer_id],
+                    archive=archive,
                 )
+            if args.format == "yaml":
+                _save_run_data(output_dir, job.cv_id, job.offer_id, data)
+        except Exception as exc:
+            journal.fail(job.cv_id, job.offer_id, repr(exc))
+            raise
+        journal.finish(job.cv_id, job.offer_id, data)
+        pause("between_offers")
+        return data
 
-                cv_path = CV_DIR / "pdf" / f"{cv_id}.pdf"
-                letter = cv_data["letter"]
-                data["optional_trace"] = populate_optional_infojobs(
-                    driver, cv_path, letter
-                )
+    def finish(driver, cv_id, results):
+        if args.format != "yaml":
+            # includes applications finished by earlier attempts of this run
+            traces = journal.results(cv_id)
+            if traces:
+                write_records(traces, output_dir / cv_id, "trace", args.format)
+        logger.info("Applications finished for CV %s" % cv_id)
+        with metrics.span("end_session", cv_id=cv_id):
+            end_session(driver, cv_id, logout=args.logout)
+        pause("between_accounts")
 
-                submit = driver.find_element(By.ID, "botonEnviar")
-                submit.click()
-                wait.until(EC.staleness_of(submit))
-                data["end_time"] = datetime.now().strftime("%Y%m%d_%H%M%S")
-                _save_run_data(OUTPUT_DIR, cv_id, offer_id, data)
-                logger.info("Finished application of offer %s for CV %s" % (offer_id, cv_id))
-                sleep(TIME_SLEEP)
-            logger.info("Applications finished for CV %s" % cv_id)
-            logout_infojobs(driver)
-            sleep(TIME_SLEEP)
-    finally:
-        driver.quit()
+    jobs = [Job(cv_id, offer_id) for cv_id in userdata for offer_id in offerdata]
+    journal.add((job.cv_id, job.offer_id) for job in jobs)
+    done = journal.done()
+    jobs = [job for job in jobs if (job.cv_id, job.offer_id) not in done]
+    logger.info(
+        "Run %s: %s applications already done, %s to run",
+        output_dir.name, len(done), len(jobs),
+    )
+    try:
+        results = run_jobs(
+            jobs,
+            AccountHooks(run=run, start=start, finish=finish),
+            driver_factory=lambda cv_id: metrics.instrument(
+                chrome_factory(cv_id, headless=args.headless)
+            ),
+            max_workers=args.workers,
+        )
+        failed = [result for result in results if not result.ok]
+        for result in failed:
+            logger.error(
+                "Failed %s for CV %s: %s", result.job.offer_id, result.job.cv_id, result.error
+            )
+        logger.info("Finished %s/%s applications", len(results) - len(failed), len(results))
 
+    finally:
+        logger.info("Run %s journal: %s", output_dir.name, journal.summary())
+        journal.close()
+        logger.info("Pacing summary: %s", get_policy().summary())
+        metrics.close()
+        metrics.write_summary(metrics_path)
 
 if __name__ == "__main__":
     main()
@@ -1,34 +1,36 @@
 from __future__ import annotations
 
-from time import sleep
+from contextlib import nullcontext
 from datetime import datetime
 import logging
 import argparse
 import os
 
-import undetected_chromedriver as uc
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
 
 import yaml
 import random
 
 from ministerio_audit.config import (
     SECRETS_PATH,
-    CHROMEDRIVER_PATH,
     INTERIM_DIR,
-    CV_DIR,
     RUNS_DIR,
-    OFFERS_DIR,
 )
-from ministerio_audit.selenium import login_infojobs
-from ministerio_audit.selenium.actions import TIME_WAIT, TIME_SLEEP, logout_infojobs
+from ministerio_audit.selenium import end_session, ensure_login, metrics
+from ministerio_audit.selenium.actions import TIME_WAIT
+from ministerio_audit.selenium.scheduler import chrome_factory
+from ministerio_audit.selenium.pacing import DEFAULT_PROFILE, PROFILES, get_policy, pause, set_profile
+from ministerio_audit.parsing import parse_application_list
 from ministerio_audit.selenium.scrape import scrape_application
+from ministerio_audit.storage import FORMATS, RecordWriter, iter_records, write_records
+from ministerio_audit.storage.archive import ARCHIVE_DIR, HtmlArchive, archive_page
+from ministerio_audit.storage.journal import ACCOUNT, CampaignJournal
+from ministerio_audit.storage.snapshots import ApplicationSnapshots
 
 DIR_PREFIX = "infojobs_consult"
+# subdirectory of a run with the --incremental delta records, out of the panel's way
+DELTA_DIR = "deltas"
 TIMESTAMP = datetime.now().strftime("%Y%m%d_%H%M%S")
 OUTPUT_DIR = (
     INTERIM_DIR / DIR_PREFIX / f"{DIR_PREFIX}_{TIMESTAMP}"
@@ -79,6 +81,45 @@ def _parse_args():
         default=",".join(DEFAULT_CVS),
         help="Comma-separated CV ids (default: %(default)s)",
     )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="jsonl",
+        help="Storage format for per-CV results; results are appended to "
+        "<cv_id>.jsonl while scraping and converted when a CV finishes "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--logout",
+        action="store_true",
+        help="Log out after each CV instead of keeping the session for the next run",
+    )
+    parser.add_argument(
+        "--pacing",
+        choices=sorted(PROFILES),
+        default=os.environ.get("PACING_PROFILE", DEFAULT_PROFILE),
+        help="Delay profile between browser actions (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help=f"Do not keep raw HTML snapshots of visited pages in {ARCHIVE_DIR}",
+    )
+    parser.add_argument(
+        "--resume",
+        default=None,
+        metavar="RUN",
+        help="Continue run RUN (e.g. infojobs_consult_20240101_120000): skip "
+        "finished CVs and applications already consulted",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Open only applications whose entry in the list changed since the "
+        "last run; unchanged ones are copied from their snapshot, and what changed "
+        f"is also written to <run>/{DELTA_DIR}/<cv_id>.jsonl",
+    )
+    parser.add_argument("--headless", action="store_true", help="Run Chrome without a window")
     return parser.parse_args()
 
 
@@ -94,16 +135,19 @@ def _load_config(cv_ids: list[str]):
 
 
 
-def _append_cv_results(output_dir, cv_id, rows):
-    output_dir.mkdir(parents=True, exist_ok=True)
-    out = output_dir / f"{cv_id}.yaml"
-    existing = []
-    if out.exists():
-        with out.open(encoding="utf-8") as f:
-            existing = yaml.safe_load(f) or []
-    existing.extend(rows)
-    with out.open("w", encoding="utf-8") as f:
-        yaml.safe_dump(existing, f, sort_keys=False, allow_unicode=True)
+def _compact_cv_results(output_dir, cv_id, fmt):
+    """Rewrite the append-only log of a finished CV in the requested format."""
+    log_path = output_dir / f"{cv_id}.jsonl"
+    if fmt == "jsonl" or not log_path.exists():
+        return log_path
+    records = list(iter_records(log_path))
+    if not records:
+        # resumed CV compacted before; keep the existing file
+        log_path.unlink()
+        return None
+    out = write_records(records, output_dir / cv_id, "application", fmt)
+    log_path.unlink()
+    return out
 
 
 def main():
@@ -111,6 +155,13 @@ def main():
     cv_ids = _split_csv_arg(args.cvs)
     random.shuffle(cv_ids)
     userdata = _load_config(cv_ids)
+    set_profile(args.pacing)
+    archive = None if args.no_archive else HtmlArchive()
+    output_dir = OUTPUT_DIR.parent / args.resume if args.resume else OUTPUT_DIR
+    if args.resume and not CampaignJournal.exists(args.resume):
+        raise RuntimeError(f"No campaign journal for run {args.resume}")
+    journal = CampaignJournal(output_dir.name)
+    metrics_path = metrics.configure(output_dir.name)
 
     logger.info(
         "Starting scraping for consulting offers of %s CV",
@@ -123,60 +174,121 @@ def main():
     if not userdata:
         raise RuntimeError("No accounts configured in secrets file.")
 
-    service = Service(CHROMEDRIVER_PATH)
-    driver = uc.Chrome(service=service, use_subprocess=False)
-    wait = WebDriverWait(driver, TIME_WAIT)
+    driver = None
     try:
         for cv_id, cv_data in userdata.items():
+            if journal.is_done(cv_id, ACCOUNT):
+                logger.info("Skipping %s; consulted in this run already", cv_id)
+                continue
+            journal.start(cv_id, ACCOUNT)
+            # one Chrome profile per CV, as in apply_offers.py, so no session
+            # or cookie of one account is ever seen by another
+            driver = metrics.instrument(chrome_factory(cv_id, headless=args.headless))
+            wait = metrics.wait(driver, TIME_WAIT)
             email = cv_data["infojobs_email"]
             password = cv_data["infojobs_password"]
-            login_infojobs(driver, email, password)
-            sleep(TIME_SLEEP)
-            
-            wait.until(
-                EC.presence_of_element_located(
-                    (By.XPATH, "//a[contains(@class, 'trackingMainMenuMyApplication')]")
-                )
-            ).click()
+            with metrics.span("session", cv_id=cv_id):
+                ensure_login(driver, cv_id, email, password)
+                pause("after_login")
+
+            with metrics.span("applications", cv_id=cv_id):
+                wait.until(
+                    EC.presence_of_element_located(
+                        (By.XPATH, "//a[contains(@class, 'trackingMainMenuMyApplication')]")
+                    )
+                ).click()
 
-            _urls = wait.until(
-                EC.presence_of_all_elements_located(
-                    (By.XPATH, "//li[contains(@id, 'inscription-')]/div/h2/a[@href]")
+                wait.until(
+                    EC.presence_of_all_elements_located(
+                        (By.XPATH, "//li[contains(@id, 'inscription-')]/div/h2/a[@href]")
+                    )
+                )
+                items = parse_application_list(
+                    archive_page(archive, driver, "applications"),
+                    base_url=driver.current_url,
                 )
-            )
-            urls = [u.get_property("href") for u in _urls]
+            urls = [item.url for item in items]
 
             logger.info("Found %s applications", len(urls))
+            journal.add((cv_id, url) for url in urls)
+            done = journal.done(cv_id)
+            unchanged = 0
 
-            for url in urls:
-                driver.get(url)
-                data = {
-                    "cv_id": cv_id,
-                    "url": url,
-                    "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
-                }
-                data.update(scrape_application(driver, wait))
-                _append_cv_results(OUTPUT_DIR, cv_id, [data])
-                sleep(TIME_SLEEP)
-            driver.find_element(
-                By.ID, "menu_tab_26"
-            ).click()  # go to empleos so we have avatar
-            wait.until(
-                EC.presence_of_element_located(
-                    (By.XPATH, "//form[@aria-label='Buscar ofertas']")
+            with (
+                ApplicationSnapshots(cv_id) as snapshots,
+                RecordWriter(output_dir / f"{cv_id}.jsonl") as writer,
+                (
+                    RecordWriter(output_dir / DELTA_DIR / f"{cv_id}.jsonl")
+                    if args.incremental
+                    else nullcontext()
+                ) as deltas,
+            ):
+                for item in items:
+                    url = item.url
+                    if (cv_id, url) in done:
+                        continue
+                    if args.incremental and snapshots.unchanged(url, item.fingerprint):
+                        # every run keeps a full row per application, stamped with this run
+                        previous = snapshots.record(url)
+                        writer.append(
+                            {
+                                **previous,
+                                "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
+                                "observed_timestamp": previous.get("timestamp"),
+                            }
+                        )
+                        writer.sync()
+                        journal.finish(cv_id, url)
+                        unchanged += 1
+                        continue
+                    journal.start(cv_id, url)
+                    data = {
+                        "cv_id": cv_id,
+                        "url": url,
+                        "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
+                    }
+                    with metrics.span("job", cv_id=cv_id, url=url):
+                        driver.get(url)
+                        data.update(scrape_application(driver, wait, archive=archive))
+                    writer.append(data)
+                    if deltas is not None:
+                        deltas.append(snapshots.delta(url, data))
+                    writer.sync()
+                    snapshots.update(url, item.fingerprint, data)
+                    journal.finish(cv_id, url)
+                    pause("between_offers")
+            if args.incremental:
+                logger.info("Skipped %s unchanged applications for %s", unchanged, cv_id)
+            _compact_cv_results(output_dir, cv_id, args.format)
+            if args.logout:
+                driver.find_element(
+                    By.ID, "menu_tab_26"
+                ).click()  # go to empleos so we have avatar
+                wait.until(
+                    EC.presence_of_element_located(
+                        (By.XPATH, "//form[@aria-label='Buscar ofertas']")
+                    )
                 )
-            )
-            sleep(TIME_SLEEP)
-            logout_infojobs(driver)
-            sleep(TIME_SLEEP)
+                pause("page_settle")
+            with metrics.span("end_session", cv_id=cv_id):
+                end_session(driver, cv_id, logout=args.logout)
+            journal.finish(cv_id, ACCOUNT)
+            driver.quit()
+            driver = None
+            pause("between_accounts")
 
     except Exception:
         logger.exception("Failed while consulting offers")
         raise
 
     finally:
-       if not os.environ.get("KEEP_BROWSER_OPEN"):
-           driver.quit()
+        logger.info("Pacing summary: %s", get_policy().summary())
+        logger.info("Run %s journal: %s", output_dir.name, journal.summary())
+        journal.close()
+        metrics.close()
+        metrics.write_summary(metrics_path)
+        if driver is not None and not os.environ.get("KEEP_BROWSER_OPEN"):
+            driver.quit()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from time import sleep
 import logging
 
 import undetected_chromedriver as uc
@@ -15,10 +14,11 @@ from ministerio_audit.config import (
     INTERIM_DIR,
     PROJECT_ROOT,
 )
-from ministerio_audit.selenium import login_infojobs, parse_fieldsets
+from ministerio_audit.selenium import ensure_login, parse_fieldsets
 from ministerio_audit.selenium.actions import applybutton_offer_infojobs, load_offer_infojobs
+from ministerio_audit.selenium.pacing import pause
+from ministerio_audit.storage.archive import HtmlArchive
 
-SLEEP = 2
 OUTPUT_DIR = INTERIM_DIR / "infojobs_fieldsets"
 
 logger = logging.getLogger(__name__)
@@ -32,12 +32,12 @@ def _load_config():
     return secrets, offers
 
 
-def _scrape_offer_fieldsets(driver, offer_id, alias, url):
+def _scrape_offer_fieldsets(driver, offer_id, alias, url, archive=None):
     out = OUTPUT_DIR / f"{offer_id}.yaml"
     logger.info("Scraping fieldsets for %s (%s)", alias, offer_id)
     try:
-        load_offer_infojobs(driver, url)
-        applybutton_offer_infojobs(driver)
+        load_offer_infojobs(driver, url, archive=archive)
+        applybutton_offer_infojobs(driver, archive=archive)
         form = driver.find_element(By.ID, "myForm")
         form_html = form.get_attribute("outerHTML")
         fieldset_data = parse_fieldsets(form_html)
@@ -70,14 +70,15 @@ def main():
 
     service = Service(CHROMEDRIVER_PATH)
     driver = uc.Chrome(service=service, use_subprocess=False)
+    archive = HtmlArchive()
     try:
-        login_infojobs(driver, email, password)
-        sleep(SLEEP)
+        ensure_login(driver, secret["id"], email, password)
+        pause("after_login")
         OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
         for offer_id, v in offers.items():
             alias, url = v["alias"], v["url"]
-            _scrape_offer_fieldsets(driver, offer_id, alias, url)
-        sleep(SLEEP)
+            _scrape_offer_fieldsets(driver, offer_id, alias, url, archive)
+            pause("between_offers")
     finally:
         driver.quit()
 
@@ -1,125 +1,192 @@
-from time import sleep
-import csv
+import argparse
 from datetime import datetime
-import json
-from pathlib import Path
-import re
-from bs4 import BeautifulSoup
-import requests
+import logging
+import os
 import undetected_chromedriver as uc
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
 from ministerio_audit.selenium import login_infojobs, submit_query_infojobs
 from ministerio_audit.selenium import get_form_text, get_offer_details
 from ministerio_audit.selenium import get_offer_elements, save_offers_data
+from ministerio_audit.selenium import metrics
+from ministerio_audit.selenium.actions import scroll_until_stable
+from ministerio_audit.selenium.crawler import (
+    CrawlProgress,
+    collect_offer_links,
+    collect_result_links,
+    go_next_page,
+    offer_key,
+    prefetch_offers,
+    previously_scraped,
+)
+from ministerio_audit.selenium.pacing import DEFAULT_PROFILE, PROFILES, get_policy, pause, set_profile
+from ministerio_audit.storage import OfferSink, iter_records
+from ministerio_audit.storage.archive import HtmlArchive
 
 
 import yaml
 
 from ministerio_audit.config import SECRETS_PATH, CHROMEDRIVER_PATH, INTERIM_DIR
 
-with open(SECRETS_PATH) as f:
-    secrets = yaml.load(f, Loader=yaml.SafeLoader).get("accounts")
-
-output_dir = INTERIM_DIR
-
-service = Service(CHROMEDRIVER_PATH)
-opts = uc.ChromeOptions()
-# PROXY = "11.456.448.110:8080"
-proxy = "8.212.177.126:8080"
-opts.add_argument('--proxy-server=%s' % proxy)
-driver = uc.Chrome(service=service, use_subprocess=False)
-
-import time
-
-secret = secrets[-1]
-email = secret["infojobs_email"]
-password = secret["infojobs_password"]
-
-login_infojobs(driver, email, password)
-
-
-# key = "Mozo/a de almacén"
-key = "Auxiliar administrativo/a"
-loc = "Barcelona"
-
-
-submit_query_infojobs(driver, key, loc)
-wait = WebDriverWait(driver, 10)
-
-offers_data = []
-seen_links = set()
-
-
-def collect_offer_links(driver, page_offers):
-    links = []
-    for offer in page_offers:
-        href = offer.find_element(
-            By.XPATH, ".//h2[contains(@id, 'job-title')]/a"
-        ).get_property("href")
-        # if not href:
-        #     try:
-        #         href = offer.find_element(By.CSS_SELECTOR, "a").get_attribute("href")
-        #     except Exception:
-        #         href = None
-        # if href:
-        links.append(href)
-    return links
-
-while True:
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    sleep(1)
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    sleep(1)
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    sleep(5)
-    page_offers = get_offer_elements(driver, wait)
-    page_links = collect_offer_links(driver, page_offers)
-
-    for link in page_links:
-        if link in seen_links:
-            continue
-        seen_links.add(link)
-        driver.get(link)
-        wait.until(EC.visibility_of_element_located((By.TAG_NAME, "body")))
-        data = get_offer_details(driver, wait)
-        data["link"] = link
-        sleep(1)
-        try:
-            sleep(2)
-            data["form_text"] = get_form_text(driver, wait)
-        except:
-            sleep(10)
-            data["form_text"] = get_form_text(driver, wait)
-        offers_data.append(data)
-        sleep(2)
-        driver.back()
-        wait.until(
-            EC.visibility_of_element_located(
-                (By.XPATH, "//nav[@class='ij-SidebarFilter']")
-            )
-        )
-        sleep(2)
-
-    try:
-        next_button = wait.until(
-            EC.element_to_be_clickable(
-                (
-                    By.XPATH,
-                    "//li[contains(@class, 'sui-MoleculePagination-item')]/button"
-                    "[.//span[normalize-space()='Siguiente']]",
+TIMESTAMP = datetime.now().strftime("%Y%m%d_%H%M%S")
+CRAWL_DIR = INTERIM_DIR / "infojobs_offers"
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Scrape InfoJobs search results")
+    # key = "Mozo/a de almacén"
+    parser.add_argument(
+        "--key",
+        default="Auxiliar administrativo/a",
+        help="Search keywords (default: %(default)s)",
+    )
+    parser.add_argument("--loc", default="Barcelona", help="Search city (default: %(default)s)")
+    parser.add_argument(
+        "--mode",
+        choices=("pipelined", "sequential"),
+        default="pipelined",
+        help="pipelined collects every result link first and prefetches offers "
+        "in several tabs; sequential visits each offer from the results page "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--tabs",
+        type=int,
+        default=3,
+        help="Browser tabs loading offers at once in pipelined mode (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--resume",
+        default=None,
+        help=f"Crawl run under {CRAWL_DIR} to resume in pipelined mode",
+    )
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        default=None,
+        help="Stop collecting links after this many result pages",
+    )
+    parser.add_argument(
+        "--rescrape",
+        action="store_true",
+        help="Also fetch offers already scraped by previous runs",
+    )
+    parser.add_argument(
+        "--pacing",
+        choices=sorted(PROFILES),
+        default=os.environ.get("PACING_PROFILE", DEFAULT_PROFILE),
+        help="Delay profile between browser actions (default: %(default)s)",
+    )
+    return parser.parse_args()
+
+
+def _crawl_sequential(driver, wait, archive):
+    seen_links = set()
+    # offers reach <INTERIM_DIR>/infojobs_offers_<ts>.jsonl as they are scraped
+    sink = OfferSink(INTERIM_DIR)
+    while True:
+        scroll_until_stable(driver)
+        page_offers = get_offer_elements(driver, wait)
+        page_links = collect_offer_links(driver, page_offers)
+
+        for link in page_links:
+            if link in seen_links:
+                continue
+            seen_links.add(link)
+            driver.get(link)
+            wait.until(EC.visibility_of_element_located((By.TAG_NAME, "body")))
+            data = get_offer_details(driver, wait, archive=archive)
+            data["link"] = link
+            pause("page_settle")
+            try:
+                data["form_text"] = get_form_text(driver, wait, archive=archive)
+            except Exception:
+                pause("retry")
+                data["form_text"] = get_form_text(driver, wait, archive=archive)
+            sink.append(data)
+            pause("page_settle")
+            driver.back()
+            wait.until(
+                EC.visibility_of_element_located(
+                    (By.XPATH, "//nav[@class='ij-SidebarFilter']")
                 )
             )
-        )
-    except TimeoutException:
-        break
+            pause("between_offers")
+
+        if not go_next_page(driver, wait):
+            break
+    return sink.finalize()
 
-    next_button.click()
-    sleep(2)
-    #wait.until(EC.staleness_of(first_offer))
 
-json_path, csv_path = save_offers_data(offers_data, output_dir)
+def _crawl_pipelined(driver, wait, archive, args):
+    run_dir = CRAWL_DIR / (args.resume or f"crawl_{TIMESTAMP}")
+    progress = CrawlProgress(run_dir)
+    links = progress.load_links()
+    if links is None:
+        skip = set() if args.rescrape else previously_scraped(
+            (INTERIM_DIR, CRAWL_DIR), exclude=run_dir
+        )
+        logger.info("Skipping %s offers scraped by previous runs", len(skip))
+        links = collect_result_links(driver, wait, max_pages=args.max_pages, skip=skip)
+        progress.save_links(links)
+    done = progress.done()
+    pending = [link for link in links if offer_key(link) not in done]
+    logger.info(
+        "Crawl %s: %s links, %s done, %s to fetch",
+        run_dir.name, len(links), len(links) - len(pending), len(pending),
+    )
+
+    with progress.writer() as writer:
+        def on_result(link, data, error):
+            writer.append(data if error is None else {"link": link, "error": error})
+
+        prefetch_offers(driver, pending, on_result, tabs=args.tabs, archive=archive)
+
+    offers_data = (r for r in iter_records(progress.offers_path) if not r.get("error"))
+    return save_offers_data(offers_data, run_dir)
+
+
+def main():
+    args = _parse_args()
+    set_profile(args.pacing)
+    with open(SECRETS_PATH) as f:
+        secrets = yaml.load(f, Loader=yaml.SafeLoader).get("accounts")
+
+    archive = HtmlArchive()
+
+    service = Service(CHROMEDRIVER_PATH)
+    opts = uc.ChromeOptions()
+    # PROXY = "11.456.448.110:8080"
+    proxy = "8.212.177.126:8080"
+    opts.add_argument('--proxy-server=%s' % proxy)
+    driver = uc.Chrome(service=service, use_subprocess=False)
+
+    secret = secrets[-1]
+    email = secret["infojobs_email"]
+    password = secret["infojobs_password"]
+    try:
+        login_infojobs(driver, email, password)
+        wait = metrics.wait(driver, 10)
+        if args.mode == "pipelined" and args.resume and CrawlProgress(
+            CRAWL_DIR / args.resume
+        ).load_links() is not None:
+            logger.info("Resuming %s; links already collected", args.resume)
+        else:
+            submit_query_infojobs(driver, args.key, args.loc)
+
+        if args.mode == "sequential":
+            json_path, csv_path = _crawl_sequential(driver, wait, archive)
+        else:
+            json_path, csv_path = _crawl_pipelined(driver, wait, archive, args)
+        logger.info("Saved offers to %s and %s", json_path, csv_path)
+    finally:
+        logger.info("Pacing summary: %s", get_policy().summary())
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+from pathlib import Path
+
+from ministerio_audit.config import INTERIM_DIR
+from ministerio_audit.storage import (
+    export_yaml,
+    iter_columnar_paths,
+    iter_record_paths,
+    read_records,
+    write_records,
+)
+
+RUNS = {
+    "application": (INTERIM_DIR / "infojobs_consult", "infojobs_consult_*"),
+    "trace": (INTERIM_DIR / "infojobs_applications", "apply_infojobs_*"),
+}
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description="Convert consult/apply run directories between YAML/JSONL and columnar formats.",
+    )
+    parser.add_argument("kind", choices=sorted(RUNS), help="Record kind of the runs")
+    parser.add_argument(
+        "--to",
+        choices=("parquet", "arrow", "yaml"),
+        default="parquet",
+        help="Target format; yaml exports columnar runs for inspection (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=None,
+        help="Directory with run folders (default: the kind's INTERIM_DIR folder)",
+    )
+    return parser.parse_args()
+
+
+def _rows_to_columnar(root: Path, pattern: str, kind: str, fmt: str):
+    by_run = {}
+    for run_dir, path in iter_record_paths(root, pattern):
+        for record in read_records(path, kind):
+            if kind == "application":
+                # consult files are named after the CV, as in build_panel.py
+                record["cv_id"] = path.stem
+            by_run.setdefault(run_dir, {}).setdefault(record.get("cv_id"), []).append(record)
+    for run_dir, by_cv in by_run.items():
+        for cv_id, records in by_cv.items():
+            out = write_records(records, run_dir / (cv_id or run_dir.name), kind, fmt)
+            print(f"Wrote {len(records)} records to {out}")
+
+
+def main():
+    args = _parse_args()
+    default_root, pattern = RUNS[args.kind]
+    root = args.root or default_root
+    if args.to == "yaml":
+        for path in iter_columnar_paths(root, pattern):
+            print(f"Exported {export_yaml(path, args.kind)}")
+    else:
+        _rows_to_columnar(root, pattern, args.kind, args.to)
+
+
+if __name__ == "__main__":
+    main()
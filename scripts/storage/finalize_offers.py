@@ -0,0 +1,42 @@
+"""Consolidate offer crawls that stopped before writing their JSON and CSV outputs."""
+
+import argparse
+import logging
+from pathlib import Path
+
+from ministerio_audit.config import INTERIM_DIR
+from ministerio_audit.storage import OfferSink
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="infojobs_offers_*.jsonl files (default: those under --root without a .json)",
+    )
+    parser.add_argument("--root", type=Path, default=INTERIM_DIR, help="(default: %(default)s)")
+    parser.add_argument(
+        "--columns",
+        default="",
+        help="Comma-separated CSV columns to keep instead of discovering them from the offers",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    paths = args.paths or [
+        path for path in sorted(args.root.glob("infojobs_offers_*.jsonl"))
+        if not path.with_suffix(".json").exists()
+    ]
+    fieldnames = [c.strip() for c in args.columns.split(",") if c.strip()] or None
+    for path in paths:
+        json_path, csv_path = OfferSink.recover(path, fieldnames)
+        print(f"{path.name}: wrote {json_path.name} and {csv_path.name}")
+
+
+if __name__ == "__main__":
+    main()
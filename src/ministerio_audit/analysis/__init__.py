@@ -1 +1,2 @@
 """Analysis pipeline helpers."""
+from .events import EVENT_TIME_FORMATS, explode_events, parse_event_times
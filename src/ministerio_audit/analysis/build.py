@@ -0,0 +1,299 @@
+"""Incremental panel build: a small DAG of fingerprinted stages.
+
+A stage's fingerprint covers its parameters, the size and mtime of its input
+files and the content digest of the outputs of the stages it depends on. A
+stage runs only when its fingerprint changed or an output is missing, so a
+dependency that re-ran but wrote identical output does not trigger the
+stages after it. Independent stages run in parallel threads. Fingerprints,
+output digests and timings are kept in ``<state dir>/state.json``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Iterable
+
+from ministerio_audit.mail import MAIL_INDEX_PATH, iter_maildirs
+from ministerio_audit.storage import YamlCache, iter_columnar_paths, iter_record_paths
+from .panel import CONSULT_DIR, CONSULT_PATTERN, MAILROOT, PANEL_DIR, consult_table, join_mail, load_mail_matches
+from .traces import TRACE_PATTERN, TRACES_DIR, write_traces
+
+logger = logging.getLogger(__name__)
+
+STATE_DIR = PANEL_DIR / ".build"
+# bump to rebuild the mail matches and panel when their layout changes
+MAIL_JOIN_VERSION = 2
+
+
+@dataclass
+class Stage:
+    """One build step; ``run()`` writes ``outputs`` and reads its deps' outputs."""
+
+    name: str
+    run: Callable[[], object]
+    outputs: tuple[Path, ...]
+    inputs: Callable[[], Iterable[Path]] = tuple
+    deps: tuple[str, ...] = ()
+    params: dict = field(default_factory=dict)
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str  # ran, skipped, failed or blocked
+    seconds: float = 0.0
+    fingerprint: str | None = None
+    error: str | None = None
+
+
+def files_fingerprint(paths: Iterable[Path]) -> str:
+    """Digest of the names, sizes and mtimes of ``paths``."""
+    digest = hashlib.sha1()
+    for path in sorted(str(p) for p in paths):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def content_digest(paths: Iterable[Path]) -> str:
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Build:
+    def __init__(self, stages: Iterable[Stage], state_dir: Path = STATE_DIR):
+        self.stages = {stage.name: stage for stage in stages}
+        for stage in self.stages.values():
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name!r} depends on unknown stages {missing}")
+        self._check_acyclic()
+        self.state_path = Path(state_dir) / "state.json"
+        self.state = {}
+        if self.state_path.exists():
+            with self.state_path.open(encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def _check_acyclic(self):
+        done, visiting = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage dependency cycle through {name!r}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def closure(self, names: Iterable[str]) -> set[str]:
+        """``names`` plus everything they depend on."""
+        todo, selected = list(names), set()
+        while todo:
+            name = todo.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage {name!r}; expected one of {sorted(self.stages)}")
+            if name not in selected:
+                selected.add(name)
+                todo.extend(self.stages[name].deps)
+        return selected
+
+    def fingerprint(self, stage: Stage) -> str:
+        payload = {
+            "params": {k: str(v) for k, v in sorted(stage.params.items())},
+            "inputs": files_fingerprint(stage.inputs()),
+            "deps": {dep: self.state.get(dep, {}).get("output") for dep in stage.deps},
+        }
+        return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def _run_stage(self, stage: Stage, force: bool) -> StageResult:
+        start = perf_counter()
+        fingerprint = self.fingerprint(stage)
+        previous = self.state.get(stage.name, {})
+        if (
+            not force
+            and previous.get("fingerprint") == fingerprint
+            and all(Path(p).exists() for p in stage.outputs)
+        ):
+            return StageResult(stage.name, "skipped", perf_counter() - start, fingerprint)
+        stage.run()
+        return StageResult(stage.name, "ran", perf_counter() - start, fingerprint)
+
+    def run(self, targets: Iterable[str] | None = None, force=(), workers: int = 4) -> list[StageResult]:
+        """Run ``targets`` (default: every stage) and what they depend on.
+
+        ``force`` names stages to run even if their fingerprint is unchanged
+        (``"all"`` forces every stage).
+        """
+        selected = self.closure(targets or self.stages)
+        force = set(self.stages) if "all" in force else set(force)
+        pending = {name: set(self.stages[name].deps) for name in selected}
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="stage") as pool:
+            running = {}
+            while pending or running:
+                for name in [n for n, deps in pending.items() if not deps]:
+                    del pending[name]
+                    running[pool.submit(self._run_stage, self.stages[name], name in force)] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as exc:
+                        logger.exception("Stage %s failed", name)
+                        result = StageResult(name, "failed", error=repr(exc))
+                    results[name] = result
+                    if result.status == "failed":
+                        self._block(name, pending, results)
+                        continue
+                    if result.status == "ran":
+                        self._record(result)
+                    for deps in pending.values():
+                        deps.discard(name)
+        self._save()
+        order = list(self.stages)
+        return sorted(results.values(), key=lambda r: order.index(r.name))
+
+    def _block(self, failed: str, pending: dict, results: dict):
+        for name in list(pending):
+            if failed in self.closure(self.stages[name].deps):
+                del pending[name]
+                results[name] = StageResult(name, "blocked", error=f"{failed} failed")
+
+    def _record(self, result: StageResult):
+        stage = self.stages[result.name]
+        self.state[result.name] = {
+            "fingerprint": result.fingerprint,
+            "output": content_digest(stage.outputs),
+            "seconds": round(result.seconds, 3),
+            "finished": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def _save(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+
+def _run_files(root: Path, pattern: str):
+    yield from (path for _, path in iter_record_paths(root, pattern))
+    yield from iter_columnar_paths(root, pattern)
+
+
+def _mail_files(mail_root: Path):
+    for maildir in iter_maildirs(mail_root):
+        for sub in ("cur", "new"):
+            folder = maildir / sub
+            if folder.is_dir():
+                yield from folder.iterdir()
+
+
+def _dump_pickle(data, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def _load_pickle(path: Path):
+    with path.open("rb") as f:
+        return pickle.load(f)
+
+
+def panel_stages(
+    consult_dir: Path = CONSULT_DIR,
+    traces_dir: Path = TRACES_DIR,
+    mail_root: Path = MAILROOT,
+    output_dir: Path = PANEL_DIR,
+    index_path: Path = MAIL_INDEX_PATH,
+    state_dir: Path = STATE_DIR,
+    mail_workers: int = 1,
+    cache: YamlCache | None = None,
+) -> list[Stage]:
+    """mail index -> mail matches, consult table and traces, then the joined panel."""
+    output_dir, state_dir = Path(output_dir), Path(state_dir)
+    matches_path = state_dir / "mail_matches.pickle"
+    consult_path = state_dir / "consult.pickle"
+    panel_path = output_dir / "consult_offers.csv"
+
+    def mail():
+        _dump_pickle(load_mail_matches(mail_root, index_path, mail_workers), matches_path)
+
+    def consult():
+        _dump_pickle(consult_table(consult_dir, cache), consult_path)
+
+    def traces():
+        write_traces(traces_dir, output_dir, TRACE_PATTERN, cache=cache)
+
+    def panel():
+        df, report = join_mail(_load_pickle(consult_path), _load_pickle(matches_path))
+        if report:
+            logger.info(
+                "Mail join: %s/%s applications matched (%s with an offer id)",
+                report["matched"], report["links"], report["with_offer_id"],
+            )
+            for cv_id, cv_report in report["by_cv"].items():
+                logger.info(
+                    "Mail join %s: %s/%s matched (rate %s)",
+                    cv_id, cv_report["matched"], cv_report["links"], cv_report["match_rate"],
+                )
+        output_dir.mkdir(parents=True, exist_ok=True)
+        df.to_csv(panel_path, index=False)
+
+    return [
+        Stage(
+            "mail",
+            mail,
+            outputs=(matches_path,),
+            inputs=lambda: _mail_files(mail_root),
+            params={"mail_root": mail_root, "version": MAIL_JOIN_VERSION},
+        ),
+        Stage(
+            "consult",
+            consult,
+            outputs=(consult_path,),
+            inputs=lambda: _run_files(consult_dir, CONSULT_PATTERN),
+            params={"consult_dir": consult_dir},
+        ),
+        Stage(
+            "traces",
+            traces,
+            outputs=(output_dir / "traces.csv", output_dir / "traces_problems.csv"),
+            inputs=lambda: _run_files(traces_dir, TRACE_PATTERN),
+            params={"traces_dir": traces_dir},
+        ),
+        Stage(
+            "panel",
+            panel,
+            outputs=(panel_path,),
+            deps=("mail", "consult"),
+            params={"output": panel_path, "version": MAIL_JOIN_VERSION},
+        ),
+    ]
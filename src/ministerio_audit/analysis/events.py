@@ -0,0 +1,57 @@
+"""Long-format event panel: one row per (application, event)."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# as shown on the application page; tried in order, then a day-first guess
+EVENT_TIME_FORMATS = ("%d/%m/%Y %H:%M", "%d/%m/%Y", "ISO8601")
+
+
+def parse_event_times(times: pd.Series) -> pd.Series:
+    """Parse event time strings to datetimes; unparseable values become NaT."""
+    times = times.astype("string")
+    parsed = pd.Series(pd.NaT, index=times.index, dtype="datetime64[ns]")
+    for fmt in EVENT_TIME_FORMATS:
+        todo = parsed.isna() & times.notna()
+        if not todo.any():
+            return parsed
+        parsed[todo] = pd.to_datetime(times[todo], format=fmt, errors="coerce")
+    todo = parsed.isna() & times.notna()
+    if todo.any():
+        parsed[todo] = pd.to_datetime(
+            times[todo], format="mixed", dayfirst=True, errors="coerce"
+        )
+    return parsed
+
+
+def explode_events(df: pd.DataFrame, column: str = "events") -> pd.DataFrame:
+    """Repeat each row of ``df`` once per entry of its ``events`` list.
+
+    The event dicts become ``event`` (text), ``event_time`` (as shown),
+    ``event_at`` (parsed) and ``event_index`` (position in the list). Rows
+    without events are kept once with empty event columns. The columns are
+    built in a single pass over the lists instead of a Series per event.
+    """
+    texts, times, positions, counts = [], [], [], []
+    for events in df[column]:
+        if events is None or not len(events):
+            texts.append(None)
+            times.append(None)
+            positions.append(pd.NA)
+            counts.append(1)
+            continue
+        for position, event in enumerate(events):
+            texts.append(event.get("text"))
+            times.append(event.get("time"))
+            positions.append(position)
+        counts.append(len(events))
+
+    rows = np.repeat(np.arange(len(df)), counts)
+    out = df.drop(columns=column).iloc[rows].reset_index(drop=True)
+    out["event"] = pd.array(texts, dtype="string")
+    out["event_time"] = pd.array(times, dtype="string")
+    out["event_at"] = parse_event_times(out["event_time"])
+    out["event_index"] = pd.array(positions, dtype="Int64")
+    return out
@@ -0,0 +1,145 @@
+"""Consult panel: consult runs joined with InfoJobs confirmation mail."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from ministerio_audit.config import DATA_DIR, INTERIM_DIR
+from ministerio_audit.mail import MAIL_INDEX_PATH, MailIndex, iter_maildirs
+from ministerio_audit.parsing.links import OfferIndex, offer_id
+from ministerio_audit.parsing.records import ConsultRecord, to_columns
+from ministerio_audit.storage import YamlCache, iter_record_paths, iter_records, load_yaml, scan_runs
+from .events import explode_events
+
+MAILROOT = DATA_DIR / "raw" / "maildir"
+CONSULT_DIR = INTERIM_DIR / "infojobs_consult"
+PANEL_DIR = INTERIM_DIR / "panels"
+CONSULT_PATTERN = "infojobs_consult_*"
+CATEGORICAL_COLUMNS = ("run_id", "cv_id")
+
+
+def iter_consult_paths(root: Path):
+    yield from iter_record_paths(root, CONSULT_PATTERN)
+
+
+def iter_consult_records(path: Path, cache: YamlCache | None = None):
+    if path.suffix == ".jsonl":
+        yield from iter_records(path)
+    else:
+        yield from load_yaml(path, cache) or []
+
+
+def _extra_columns(extras) -> dict[str, list]:
+    """Keys outside ``ConsultRecord``'s fields, one column each."""
+    keys = dict.fromkeys(key for extra in extras for key in extra)
+    return {key: [extra.get(key) for extra in extras] for key in keys}
+
+
+def scan_consult_columnar(root: Path) -> pd.DataFrame | None:
+    table = scan_runs(root, CONSULT_PATTERN, "application")
+    if table is None:
+        return None
+    # unknown keys are stored as one JSON column; spread them out as from_dict does
+    extras = [json.loads(extra) if extra else {} for extra in table.column("extra").to_pylist()]
+    df = table.drop(["extra"]).to_pandas()
+    # Arrow list columns arrive as numpy arrays; match the YAML rows
+    for column in ("job_details", "events"):
+        df[column] = df[column].map(lambda v: list(v) if v is not None else None)
+    for key, values in _extra_columns(extras).items():
+        df[key] = values
+    return df
+
+
+def _consult_frame(records: list[ConsultRecord]) -> pd.DataFrame:
+    if not records:
+        return pd.DataFrame()
+    columns = to_columns(records, ConsultRecord, plain=False)
+    columns.update(_extra_columns(columns.pop("extra")))
+    df = pd.DataFrame(columns)
+    for column in CATEGORICAL_COLUMNS:
+        df[column] = df[column].astype("category")
+    return df
+
+
+def consult_table(consult_dir: Path, cache: YamlCache | None = None) -> pd.DataFrame:
+    """Every consulted application, one row each, events still nested."""
+    records = []
+    for run_dir, path in iter_consult_paths(consult_dir):
+        for offer in iter_consult_records(path, cache):
+            record = ConsultRecord.from_dict(offer)
+            record.run_id = run_dir.name
+            record.cv_id = path.stem
+            records.append(record)
+    df = _consult_frame(records)
+    columnar = scan_consult_columnar(consult_dir)
+    if columnar is not None and not columnar.empty:
+        df = pd.concat([df, columnar], ignore_index=True) if not df.empty else columnar
+    return df
+
+
+def load_mail_matches(mail_root: Path, index_path: Path = MAIL_INDEX_PATH, workers: int = 1) -> list[dict]:
+    maildirs = sorted(iter_maildirs(mail_root))
+    with MailIndex(index_path, mail_root) as index:
+        index.update_many(maildirs, workers=workers)
+        return index.matches(maildirs)
+
+
+def _cv_key(cv_id) -> str:
+    return cv_id.strip().lower() if isinstance(cv_id, str) else ""
+
+
+def _sum_reports(reports) -> dict:
+    total = {name: sum(r[name] for r in reports) for name in ("links", "with_offer_id", "matched")}
+    total["match_rate"] = round(total["matched"] / total["links"], 4) if total["links"] else None
+    return total
+
+
+def join_mail(consult: pd.DataFrame, matches: list[dict]) -> tuple[pd.DataFrame, dict | None]:
+    """Mark the applications confirmed by mail and flatten their events.
+
+    Every CV applies to the same offers, so a row only matches mail from its
+    own CV's mailbox: the join is on ``(cv_id, offer id)``, and tracking query
+    strings and slugs do not matter. Returns the panel and the
+    ``OfferIndex.match_report`` totals, with the report of each CV under
+    ``"by_cv"``.
+    """
+    mail_links = {}
+    for match in matches:
+        mail_links.setdefault(_cv_key(match.get("cv_id")), OfferIndex()).add_many(match["links"], match)
+    no_mail = OfferIndex()
+
+    def mail_dates(index, link):
+        return " | ".join(hit.get("date", "") for hit in index.get(link) if hit.get("date"))
+
+    df = consult.copy()
+    report = None
+    if not df.empty:
+        links = df["offer_link"].fillna("") if "offer_link" in df.columns else pd.Series("", index=df.index)
+        cvs = df["cv_id"].astype(object) if "cv_id" in df.columns else pd.Series(None, index=df.index, dtype=object)
+        keys = cvs.map(_cv_key)
+        indexes = [mail_links.get(key, no_mail) for key in keys]
+        df["offer_id"] = links.map(offer_id)
+        df["mail_confirmed"] = [link in index for index, link in zip(indexes, links)]
+        df["mail_dates"] = [mail_dates(index, link) for index, link in zip(indexes, links)]
+        by_cv = {
+            cv: mail_links.get(_cv_key(cv), no_mail).match_report(cv_links)
+            for cv, cv_links in links.groupby(cvs.fillna(""), sort=True)
+        }
+        report = {**_sum_reports(by_cv.values()), "by_cv": by_cv}
+    if not df.empty and "events" in df.columns:
+        df = explode_events(df)
+    return df, report
+
+
+def build_panel(
+    consult_dir: Path = CONSULT_DIR,
+    mail_root: Path = MAILROOT,
+    index_path: Path = MAIL_INDEX_PATH,
+    workers: int = 1,
+    cache: YamlCache | None = None,
+) -> tuple[pd.DataFrame, dict | None]:
+    matches = load_mail_matches(mail_root, index_path, workers)
+    return join_mail(consult_table(consult_dir, cache), matches)
@@ -0,0 +1,121 @@
+"""Streaming loader and checks for apply traces.
+
+Traces are read one file (or one columnar batch) at a time and reduced to
+the scalar ``TRACE_COLUMNS`` as they are parsed; the heavy blobs
+(``offer_data``, ``form_trace``, ``form_text``, ...) are only looked at for
+the checks and never kept, so memory stays flat however many runs there are.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from collections import Counter
+from pathlib import Path
+
+from ministerio_audit.config import INTERIM_DIR
+from ministerio_audit.storage import (
+    YamlCache,
+    iter_columnar_paths,
+    iter_record_paths,
+    iter_records,
+    iter_table_rows,
+)
+from ministerio_audit.storage.columnar import read_records
+
+TRACES_DIR = INTERIM_DIR / "infojobs_applications"
+TRACE_PATTERN = "apply_infojobs_*"
+TRACE_FIELDS = ("cv_id", "offer_id", "alias", "url", "start_time", "end_time", "already_inscribed")
+TRACE_COLUMNS = (
+    "run_id",
+    "trace_path",
+    *TRACE_FIELDS,
+    "questions_answered",
+    "has_end_time",
+    "has_offer_data",
+    "has_optional_trace",
+)
+PROBLEM_COLUMNS = ("run_id", "cv_id", "offer_id", "trace_path", "problem")
+# columnar files: everything but form_text, requirements and extra
+COLUMNAR_FIELDS = ["run_id", *TRACE_FIELDS, "offer_data", "form_trace", "optional_trace"]
+
+
+def trace_row(trace: dict, run_id: str | None, trace_path: str) -> dict:
+    """Project a trace onto ``TRACE_COLUMNS``."""
+    form_trace = trace.get("form_trace")
+    if isinstance(form_trace, str):
+        form_trace = json.loads(form_trace)
+    row = {"run_id": run_id, "trace_path": trace_path}
+    for name in TRACE_FIELDS:
+        row[name] = trace.get(name)
+    row["questions_answered"] = len(form_trace) if isinstance(form_trace, list) else 0
+    row["has_end_time"] = trace.get("end_time") is not None
+    row["has_offer_data"] = trace.get("offer_data") is not None
+    row["has_optional_trace"] = trace.get("optional_trace") is not None
+    return row
+
+
+def trace_problems(row: dict) -> list[str]:
+    problems = []
+    if not row["has_end_time"]:
+        problems.append("missing_end_time")
+    # already-inscribed offers stop before the form
+    if row["already_inscribed"] is False:
+        if row["questions_answered"] == 0:
+            problems.append("no_questions_answered")
+        if not row["has_offer_data"]:
+            problems.append("missing_offer_data")
+        if not row["has_optional_trace"]:
+            problems.append("missing_optional_trace")
+    return problems
+
+
+def _iter_file_traces(path: Path, cache: YamlCache | None = None):
+    if path.suffix == ".jsonl":
+        return iter_records(path)
+    # apply runs keep one trace per YAML file
+    return iter(read_records(path, "trace", cache=cache))
+
+
+def iter_trace_rows(root: Path, pattern: str = TRACE_PATTERN, cache: YamlCache | None = None):
+    """Yield one ``trace_row`` per trace in the run directories under ``root``.
+
+    A file without traces still yields an empty row, so it is reported.
+    """
+    for run_dir, path in iter_record_paths(root, pattern):
+        empty = True
+        for trace in _iter_file_traces(path, cache):
+            empty = False
+            yield trace_row(trace, run_dir.name, str(path))
+        if empty:
+            yield trace_row({}, run_dir.name, str(path))
+    for path in iter_columnar_paths(root, pattern):
+        for trace in iter_table_rows(path, "trace", columns=COLUMNAR_FIELDS):
+            yield trace_row(trace, trace["run_id"], str(path))
+
+
+def write_traces(
+    root: Path, output_dir: Path, pattern: str = TRACE_PATTERN, cache: YamlCache | None = None
+) -> Counter:
+    """Stream the traces under ``root`` to ``traces.csv`` and ``traces_problems.csv``.
+
+    Returns the number of traces (``"traces"``) and of each problem.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    counts = Counter()
+    with (
+        (output_dir / "traces.csv").open("w", encoding="utf-8", newline="") as traces_file,
+        (output_dir / "traces_problems.csv").open("w", encoding="utf-8", newline="") as problems_file,
+    ):
+        traces = csv.DictWriter(traces_file, fieldnames=TRACE_COLUMNS)
+        problems = csv.DictWriter(problems_file, fieldnames=PROBLEM_COLUMNS, extrasaction="ignore")
+        traces.writeheader()
+        problems.writeheader()
+        for row in iter_trace_rows(root, pattern, cache):
+            traces.writerow(row)
+            counts["traces"] += 1
+            for problem in trace_problems(row):
+                problems.writerow({**row, "problem": problem})
+                counts[problem] += 1
+    return counts
@@ -1,2 +1,3 @@
-from .constants import PROJECT_ROOT, DATA_DIR, INTERIM_DIR, SECRETS_PATH, OFFERS_DIR, RUNS_DIR, CV_DIR
+from .constants import PROJECT_ROOT, DATA_DIR, INTERIM_DIR, SECRETS_DIR, SECRETS_PATH, OFFERS_DIR, RUNS_DIR, CV_DIR
 from .constants import GECKODRIVER_PATH, CHROMEDRIVER_PATH, INFOJOBS_LOGIN, INFOJOBS_MAIN
+from .constants import INFOJOBS_ACCOUNT, INFOJOBS_BASE, INFOJOBS_PUBLIC
@@ -30,5 +30,10 @@ RUNS_DIR = _env_path("RUNS_DIR", PROJECT_ROOT / "runs")
 GECKODRIVER_PATH = which("geckodriver")
 CHROMEDRIVER_PATH = which("chromedriver")
 
-INFOJOBS_LOGIN = "https://www.infojobs.net/candidate/candidate-login/candidate-login.xhtml"
-INFOJOBS_MAIN = "https://www.infojobs.net/"
+INFOJOBS_PUBLIC = "https://www.infojobs.net"
+# point the Selenium flows at another host, e.g. the local stand-in site
+INFOJOBS_BASE = os.environ.get("INFOJOBS_BASE_URL", INFOJOBS_PUBLIC).rstrip("/")
+INFOJOBS_LOGIN = f"{INFOJOBS_BASE}/candidate/candidate-login/candidate-login.xhtml"
+INFOJOBS_MAIN = f"{INFOJOBS_BASE}/"
+# candidate CV page; shows the account's email, to check whose session is open
+INFOJOBS_ACCOUNT = f"{INFOJOBS_BASE}/candidate/cv/view/index.xhtml"
@@ -1 +1,4 @@
 """Maildir helpers and parsing."""
+from .messages import iter_maildirs, extract_text, extract_infojobs_links, extract_message_links, is_inscription
+from .scan import MailEntry, read_headers, scan_maildir
+from .index import MAIL_INDEX_PATH, MailIndex, maildir_cv_id
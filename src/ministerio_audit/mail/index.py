@@ -0,0 +1,225 @@
+"""Persistent SQLite index of parsed maildir messages."""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from ministerio_audit.config import RUNS_DIR
+from .messages import extract_message_links, is_inscription
+from .scan import MailEntry, scan_maildir
+
+logger = logging.getLogger(__name__)
+
+MAIL_INDEX_PATH = RUNS_DIR / "mail" / "index.sqlite"
+# bump when parse_entry changes so cached rows are rebuilt
+INDEX_VERSION = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    maildir TEXT NOT NULL,
+    key TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    date TEXT,
+    subject TEXT,
+    sender TEXT,
+    inscription INTEGER NOT NULL,
+    links TEXT NOT NULL,
+    cv_id TEXT,
+    PRIMARY KEY (maildir, key)
+)
+"""
+
+
+def maildir_cv_id(maildir: Path, mail_root: Path | None = None) -> str:
+    """CV account owning ``maildir``, laid out as ``<mail root>/<cv_id>/<folder>``."""
+    maildir = Path(maildir)
+    if mail_root is not None:
+        try:
+            return maildir.relative_to(mail_root).parts[0]
+        except (ValueError, IndexError):
+            pass
+    return maildir.parent.name
+
+
+def parse_entry(entry: MailEntry) -> dict:
+    """Extract the indexed fields, decoding the body only for confirmations."""
+    subject = entry.get("Subject")
+    sender = entry.get("From")
+    inscription = is_inscription(subject, sender)
+    links = []
+    if inscription:
+        links = extract_message_links(entry.message())
+    return {
+        "date": entry.get("Date"),
+        "subject": subject,
+        "sender": sender,
+        "inscription": inscription,
+        "links": links,
+    }
+
+
+def _parse_path(path: Path):
+    try:
+        return parse_entry(MailEntry(path.name, path, None))
+    except FileNotFoundError:
+        return None
+
+
+class MailIndex:
+    """Cache of message headers and InfoJobs links keyed by maildir file.
+
+    A message is re-parsed only when its file is new or its mtime/size
+    changed since the last update; flag-only renames keep the cached row.
+    Each row also records the CV whose mailbox it came from (see
+    ``maildir_cv_id``), since every CV applies to the same offers.
+    """
+
+    def __init__(self, path: Path = MAIL_INDEX_PATH, mail_root: Path | None = None):
+        self.path = Path(path)
+        self.mail_root = Path(mail_root) if mail_root is not None else None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != INDEX_VERSION:
+            logger.info("Mail index version %s is stale, rebuilding", version)
+            self.conn.execute("DROP TABLE IF EXISTS messages")
+            self.conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self.conn.execute(_SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _cached(self, maildir: str) -> dict:
+        rows = self.conn.execute(
+            "SELECT key, filename, mtime_ns, size FROM messages WHERE maildir = ?",
+            (maildir,),
+        )
+        return {key: (filename, mtime_ns, size) for key, filename, mtime_ns, size in rows}
+
+    def _plan(self, maildir: Path):
+        """Split ``maildir`` into stale entries, flag renames and removals."""
+        maildir_key = str(maildir)
+        cached = self._cached(maildir_key)
+        seen = set()
+        renamed = []
+        stale = []
+        for entry in scan_maildir(maildir):
+            key, stat, filename = entry.key, entry.stat, entry.path.name
+            seen.add(key)
+            previous = cached.get(key)
+            if previous and previous[1:] == (stat.st_mtime_ns, stat.st_size):
+                if previous[0] != filename:
+                    renamed.append((filename, maildir_key, key))
+                continue
+            stale.append(entry)
+        removed = [(maildir_key, key) for key in cached.keys() - seen]
+        return stale, renamed, removed, len(seen)
+
+    def _apply(self, maildir: Path, stale, records, renamed, removed, total) -> dict:
+        maildir_key = str(maildir)
+        cv_id = maildir_cv_id(maildir, self.mail_root)
+        parsed = []
+        for entry, record in zip(stale, records):
+            if record is None:
+                # moved between new/ and cur/ while scanning
+                logger.debug("Message %s vanished during scan", entry.path)
+                continue
+            parsed.append(
+                (
+                    maildir_key,
+                    entry.key,
+                    entry.path.name,
+                    entry.stat.st_mtime_ns,
+                    entry.stat.st_size,
+                    record["date"],
+                    record["subject"],
+                    record["sender"],
+                    int(record["inscription"]),
+                    json.dumps(record["links"]),
+                    cv_id,
+                )
+            )
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                parsed,
+            )
+            self.conn.executemany(
+                "UPDATE messages SET filename = ? WHERE maildir = ? AND key = ?",
+                renamed,
+            )
+            self.conn.executemany(
+                "DELETE FROM messages WHERE maildir = ? AND key = ?", removed
+            )
+        stats = {
+            "parsed": len(parsed),
+            "cached": total - len(stale),
+            "removed": len(removed),
+        }
+        logger.info("Indexed %s: %s", maildir, stats)
+        return stats
+
+    def update(self, maildir: Path) -> dict:
+        """Sync the index with ``maildir`` and return counts of work done."""
+        stale, renamed, removed, total = self._plan(maildir)
+        records = [_parse_path(entry.path) for entry in stale]
+        return self._apply(maildir, stale, records, renamed, removed, total)
+
+    def update_many(self, maildirs, workers: int = 1) -> dict:
+        """Sync several maildirs, parsing stale messages on ``workers`` processes.
+
+        Messages from all maildirs are parsed in one pool and written back
+        in scan order, so the index ends up identical to a serial update.
+        """
+        plans = [(maildir, *self._plan(maildir)) for maildir in maildirs]
+        paths = [entry.path for _, stale, *_ in plans for entry in stale]
+        if workers > 1 and len(paths) > 1:
+            chunksize = max(1, len(paths) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                records = list(pool.map(_parse_path, paths, chunksize=chunksize))
+        else:
+            records = [_parse_path(path) for path in paths]
+
+        totals = {"parsed": 0, "cached": 0, "removed": 0}
+        offset = 0
+        for maildir, stale, renamed, removed, total in plans:
+            chunk = records[offset : offset + len(stale)]
+            offset += len(stale)
+            stats = self._apply(maildir, stale, chunk, renamed, removed, total)
+            for name, count in stats.items():
+                totals[name] += count
+        return totals
+
+    def matches(self, maildirs) -> list[dict]:
+        """Return indexed inscription confirmations for ``maildirs``, with their ``cv_id``."""
+        matches = []
+        for maildir in maildirs:
+            rows = self.conn.execute(
+                "SELECT cv_id, date, subject, sender, links FROM messages "
+                "WHERE maildir = ? AND inscription = 1 ORDER BY filename",
+                (str(maildir),),
+            )
+            for cv_id, date, subject, sender, links in rows:
+                matches.append(
+                    {
+                        "cv_id": cv_id or maildir_cv_id(maildir, self.mail_root),
+                        "date": date,
+                        "subject": subject,
+                        "from": sender,
+                        "links": json.loads(links),
+                    }
+                )
+        return matches
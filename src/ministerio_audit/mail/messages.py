@@ -0,0 +1,70 @@
+"""Message-level helpers for synced maildirs."""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+from ministerio_audit.parsing import html_text_and_links
+
+INSCRIPTION_SUBJECT = "te has inscrito a una oferta"
+INFOJOBS_SENDER = "infojobs"
+INFOJOBS_LINK_RE = re.compile(r"https?://(?:www\.)?infojobs\.net/[^\s)\"']+")
+
+
+def iter_maildirs(root: Path):
+    for p in root.rglob("cur"):
+        yield p.parent
+
+
+def is_inscription(subject, sender) -> bool:
+    subject = str(subject or "").lower()
+    sender = str(sender or "").lower()
+    return INSCRIPTION_SUBJECT in subject and INFOJOBS_SENDER in sender
+
+
+def extract_text_and_links(msg) -> tuple[str, list[str]]:
+    """Return the message text and the ``href`` targets of its HTML parts."""
+    parts = []
+    hrefs = []
+
+    if msg.is_multipart():
+        for part in msg.walk():
+            ctype = part.get_content_type()
+            if ctype in ("text/plain", "text/html"):
+                payload = part.get_payload(decode=True)
+                if not payload:
+                    continue
+
+                text = payload.decode(errors="ignore")
+
+                if ctype == "text/html":
+                    text, part_hrefs = html_text_and_links(text)
+                    hrefs.extend(part_hrefs)
+
+                parts.append(text)
+    else:
+        payload = msg.get_payload(decode=True)
+        if payload:
+            parts.append(payload.decode(errors="ignore"))
+
+    return "\n".join(parts).strip(), hrefs
+
+
+def extract_text(msg):
+    return extract_text_and_links(msg)[0]
+
+
+def extract_infojobs_links(text: str) -> list[str]:
+    return INFOJOBS_LINK_RE.findall(text)
+
+
+def extract_message_links(msg) -> list[str]:
+    """InfoJobs links found in the text or in ``<a href>`` of a message, deduplicated."""
+    text, hrefs = extract_text_and_links(msg)
+    links = extract_infojobs_links(text)
+    for href in hrefs:
+        match = INFOJOBS_LINK_RE.match(href)
+        if match:
+            links.append(match.group(0))
+    return list(dict.fromkeys(links))
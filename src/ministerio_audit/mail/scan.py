@@ -0,0 +1,82 @@
+"""Header-first maildir scanning with lazily decoded bodies."""
+
+from __future__ import annotations
+
+import email
+import mailbox
+import os
+import re
+from email.parser import BytesHeaderParser
+from pathlib import Path
+
+HEADER_CHUNK = 8192
+HEADER_READ_LIMIT = 256 * 1024
+_HEADER_END_RE = re.compile(rb"\r?\n\r?\n")
+_header_parser = BytesHeaderParser()
+
+
+def read_headers(path: Path):
+    """Parse only the header block of a message file.
+
+    The file is read in chunks until the first blank line, so the body is
+    never loaded. Unusually large header blocks are cut at
+    ``HEADER_READ_LIMIT`` bytes.
+    """
+    buf = b""
+    with open(path, "rb") as handle:
+        while len(buf) < HEADER_READ_LIMIT:
+            chunk = handle.read(HEADER_CHUNK)
+            if not chunk:
+                break
+            # search from the previous tail so a split separator is found
+            start = max(len(buf) - 3, 0)
+            buf += chunk
+            end = _HEADER_END_RE.search(buf, start)
+            if end:
+                buf = buf[: end.end()]
+                break
+    return _header_parser.parsebytes(buf)
+
+
+class MailEntry:
+    """One maildir message whose headers are read eagerly and body on demand."""
+
+    __slots__ = ("key", "path", "stat", "_headers", "_message")
+
+    def __init__(self, key: str, path: Path, stat: os.stat_result):
+        self.key = key
+        self.path = path
+        self.stat = stat
+        self._headers = None
+        self._message = None
+
+    @property
+    def headers(self):
+        if self._headers is None:
+            self._headers = read_headers(self.path)
+        return self._headers
+
+    def get(self, name, default=None):
+        value = self.headers.get(name)
+        return str(value) if value is not None else default
+
+    def message(self):
+        """Parse and return the full message, decoding the body once."""
+        if self._message is None:
+            with open(self.path, "rb") as handle:
+                self._message = email.message_from_binary_file(handle)
+        return self._message
+
+
+def scan_maildir(maildir: Path):
+    """Yield a ``MailEntry`` for every message in ``cur`` and ``new``."""
+    for subdir in ("cur", "new"):
+        try:
+            entries = list(os.scandir(maildir / subdir))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.is_file():
+                continue
+            key = entry.name.split(mailbox.Maildir.colon)[0]
+            yield MailEntry(key, Path(entry.path), entry.stat())
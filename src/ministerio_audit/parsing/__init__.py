@@ -1 +1,8 @@
 """Parsing utilities for offers and CVs."""
+from .html import html_text_and_links, html_to_text
+from .records import OfferDetail, FormPage, ApplicationEvent, ApplicationPage, ApplicationListItem
+from .records import ConsultRecord, from_columns, to_columns
+from .offers import parse_offer_detail, parse_form
+from .forms import parse_fieldsets
+from .applications import parse_application, parse_application_list
+from .links import OFFER_ID_RE, OfferIndex, link_key, offer_id
@@ -0,0 +1,112 @@
+"""Offline parser for the InfoJobs application status page."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from urllib.parse import urljoin
+
+from .offers import _soup, _text
+from .records import ApplicationListItem, ApplicationPage
+
+logger = logging.getLogger(__name__)
+
+# relative dates in the application list, which change every day
+RELATIVE_DATE_RE = re.compile(
+    r"\b(?:hace\s+(?:\d+|un|una)\s+\w+|hoy|ayer|anteayer)\b", re.IGNORECASE
+)
+
+
+def _inner_text(el) -> str:
+    """Approximate ``innerText``: one whitespace-collapsed line per text node."""
+    if el is None:
+        return ""
+    lines = (" ".join(line.split()) for line in el.get_text("\n").splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _href(el, base_url):
+    href = el.get("href") if el is not None else None
+    if href and base_url:
+        # WebElement.get_attribute("href") returns the resolved URL
+        return urljoin(base_url, href)
+    return href
+
+
+def parse_application(html, base_url: str | None = None) -> ApplicationPage:
+    """Parse an application page snapshot.
+
+    ``base_url`` (the page URL) resolves relative links the way the browser
+    does.
+    """
+    soup = _soup(html)
+    data = {}
+    job_title = soup.select_one("h2[class='job-list-title']")
+    if job_title is None:
+        raise ValueError("Application page without job title")
+    data["job_title"] = _text(job_title)
+    title_link = job_title.find("a")
+    data["offer_link"] = _href(title_link if title_link else job_title, base_url) or ""
+
+    job_subtitle = soup.select_one("h3[class='job-list-subtitle']")
+    if job_subtitle is None:
+        logger.info("No subtitle info found for %s", data["offer_link"])
+    else:
+        data["job_subtitle"] = _text(job_subtitle)
+        subtitle_link = job_subtitle.find("a")
+        if subtitle_link is None:
+            logger.info("No subtitle href info found for %s", data["offer_link"])
+        data["job_subtitle_href"] = _href(subtitle_link, base_url)
+
+    details_ul = job_title.find_next_sibling("ul")
+    if details_ul is None:
+        logger.info("No subtitle details list found for %s", data["offer_link"])
+    else:
+        data["job_details"] = [
+            text for text in (_text(li) for li in details_ul.find_all("li")) if text
+        ]
+
+    parent = job_title.parent
+    next_div = parent.find_next_sibling("div") if parent.name == "div" else None
+    if next_div is None:
+        logger.info("No next div found for %s", data["offer_link"])
+    data["next_div"] = _inner_text(next_div)
+
+    data["all_job_desc"] = _inner_text(soup.select_one("div[class*='job-list']"))
+
+    data["events"] = [
+        {"text": _text(event.select_one("p#event-text")), "time": _text(event.find("time"))}
+        for event in soup.select("li[id^='event-']")
+    ]
+    # from_dict interns the subtitle and event texts
+    return ApplicationPage.from_dict(data)
+
+
+def _status_text(li) -> str:
+    """Text of a list item outside its title and ``<time>`` elements, without relative dates."""
+    parts = []
+    for string in li.find_all(string=True):
+        parents = {parent.name for parent in string.parents}
+        if parents.isdisjoint(("h2", "time", "script", "style")):
+            parts.append(string)
+    return " ".join(RELATIVE_DATE_RE.sub(" ", " ".join(parts)).split())
+
+
+def parse_application_list(html, base_url: str | None = None) -> list[ApplicationListItem]:
+    """Parse the "Mis candidaturas" list into application URLs and fingerprints.
+
+    The fingerprint hashes only the stable fields of the ``inscription-`` item:
+    the application link, the offer title and the status text. ``<time>``
+    elements and relative dates ("hace 3 días", "ayer") are left out, since
+    they change daily even when the application does not.
+    """
+    soup = _soup(html)
+    items = []
+    for li in soup.select("li[id*='inscription-']"):
+        status = _status_text(li)
+        for link in li.select(":scope > div > h2 > a[href]"):
+            url = _href(link, base_url)
+            key = "\0".join((url, _text(link), status))
+            items.append(ApplicationListItem(url, hashlib.sha1(key.encode("utf-8")).hexdigest()))
+    return items
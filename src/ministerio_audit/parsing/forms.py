@@ -0,0 +1,94 @@
+"""Offline parser for the question fieldsets of InfoJobs apply forms.
+
+Built on lxml with precompiled XPath: labels are indexed by their ``for``
+attribute once per fieldset instead of searched for every input. The output
+is the same as the original BeautifulSoup parser (see
+``scripts/bench/bench_fieldsets.py``).
+"""
+
+from __future__ import annotations
+
+from lxml import etree
+
+_PARSER = etree.HTMLParser()
+# BeautifulSoup's get_text() leaves out script, style and template contents
+_TEXT = etree.XPath(
+    ".//text()[not(ancestor::script or ancestor::style or ancestor::template)]"
+)
+_MY_FORM = etree.XPath("(//form[@id='myForm'])[1]")
+_FIRST_FORM = etree.XPath("(//form)[1]")
+_FIELDSETS = etree.XPath(".//fieldset")
+_LEGEND = etree.XPath("(.//legend)[1]")
+_INPUTS = etree.XPath(".//*[self::input or self::textarea or self::select]")
+_LABELS = etree.XPath(".//label[@for]")
+_OPTIONS = etree.XPath(".//option")
+
+
+def _text(el) -> str:
+    """Same as BeautifulSoup's ``get_text(" ", strip=True)``."""
+    return " ".join(s for s in (t.strip() for t in _TEXT(el)) if s)
+
+
+def _label_index(fieldset) -> dict:
+    index = {}
+    for label in _LABELS(fieldset):
+        index.setdefault(label.get("for"), label)
+    return index
+
+
+def _form_root(form_html):
+    if isinstance(form_html, etree._Element):
+        return form_html
+    root = etree.fromstring(form_html, _PARSER)
+    if root is None:
+        return None
+    # accepts the form's outerHTML or a whole archived page
+    forms = _MY_FORM(root) or _FIRST_FORM(root)
+    return forms[0] if forms else root
+
+
+def parse_fieldsets(form_html):
+    form = _form_root(form_html)
+    if form is None:
+        return []
+    fieldsets = []
+    for idx, fieldset in enumerate(_FIELDSETS(form), start=1):
+        legend = _LEGEND(fieldset)
+        question = _text(legend[0]) if legend else ""
+        labels = _label_index(fieldset)
+        inputs = []
+        for input_el in _INPUTS(fieldset):
+            tag_name = input_el.tag
+            input_type = (
+                input_el.get("type", "text") if tag_name == "input" else tag_name
+            )
+            input_id = input_el.get("id", "")
+            input_name = input_el.get("name", "")
+            label_text = ""
+            if input_id:
+                label = labels.get(input_id)
+                if label is not None:
+                    label_text = _text(label)
+            entry = {
+                "type": input_type,
+                "id": input_id,
+                "name": input_name,
+                "label": label_text,
+            }
+            if tag_name == "select":
+                entry["options"] = [
+                    {
+                        "value": opt.get("value", ""),
+                        "label": _text(opt),
+                    }
+                    for opt in _OPTIONS(input_el)
+                ]
+            inputs.append(entry)
+        fieldsets.append(
+            {
+                "index": idx,
+                "question": question,
+                "inputs": inputs,
+            }
+        )
+    return fieldsets
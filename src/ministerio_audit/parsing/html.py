@@ -0,0 +1,73 @@
+"""Single-pass HTML to text extraction without building a document tree."""
+
+from __future__ import annotations
+
+from lxml import etree
+
+SKIP_TAGS = frozenset({"script", "style", "template"})
+
+
+class _TextLinkTarget:
+    """lxml parser target collecting visible text and ``href`` attributes.
+
+    lxml may deliver one text node in several ``data`` calls, so chunks are
+    buffered until the next tag. Whitespace-only nodes collapse to a single
+    newline or space, as BeautifulSoup does.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.hrefs = []
+        self._buf = []
+        self._skip = 0
+
+    def _flush(self):
+        if not self._buf:
+            return
+        text = "".join(self._buf)
+        self._buf = []
+        if not text.strip():
+            text = "\n" if "\n" in text else " "
+        self.parts.append(text)
+
+    def start(self, tag, attrib):
+        self._flush()
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        href = attrib.get("href")
+        if href:
+            self.hrefs.append(href.strip())
+
+    def end(self, tag):
+        self._flush()
+        if tag in SKIP_TAGS and self._skip:
+            self._skip -= 1
+
+    def data(self, data):
+        if not self._skip:
+            self._buf.append(data)
+
+    def comment(self, text):
+        self._flush()
+
+    def close(self):
+        self._flush()
+        return self.parts, self.hrefs
+
+
+def html_text_and_links(html: str | bytes, separator: str = " "):
+    """Return ``(text, hrefs)`` for an HTML document in one streaming pass.
+
+    Text nodes are joined with ``separator`` like ``BeautifulSoup.get_text``;
+    script, style and template contents are skipped.
+    """
+    if not html or not html.strip():
+        return "", []
+    parser = etree.HTMLParser(target=_TextLinkTarget(), recover=True)
+    parser.feed(html)
+    parts, hrefs = parser.close()
+    return separator.join(parts), hrefs
+
+
+def html_to_text(html: str | bytes, separator: str = " ") -> str:
+    return html_text_and_links(html, separator)[0]
@@ -0,0 +1,72 @@
+"""Canonical InfoJobs offer ids and an index to join records on them.
+
+Offer URLs carry search tracking in the query string (``applicationOrigin``,
+``searchId``, ``page``) and a slug that can change with the title, so the
+same offer shows up under many URLs across mail, consult runs and
+``config/urls.yaml``. The ``of-i<30 hex>`` path segment is the stable part.
+"""
+
+from __future__ import annotations
+
+import re
+from urllib.parse import unquote
+
+OFFER_ID_RE = re.compile(r"of-i([0-9a-f]{30})(?![0-9a-f])", re.IGNORECASE)
+
+
+def offer_id(link: str | None) -> str | None:
+    """The 30-hex offer id in ``link``, lowercased; None if there is none.
+
+    Percent-encoded links (redirects that wrap the offer URL) are decoded
+    first.
+    """
+    if not link:
+        return None
+    match = OFFER_ID_RE.search(link)
+    if match is None and "%" in link:
+        match = OFFER_ID_RE.search(unquote(link))
+    return match.group(1).lower() if match else None
+
+
+def link_key(link: str | None) -> str:
+    """Join key of ``link``: its offer id, or the link itself without one."""
+    return offer_id(link) or (link or "")
+
+
+class OfferIndex:
+    """Multi-map from ``link_key`` to the items added under any of its links."""
+
+    def __init__(self):
+        self._items = {}
+
+    def add(self, link: str, item):
+        self._items.setdefault(link_key(link), []).append(item)
+
+    def add_many(self, links, item):
+        """Add ``item`` once per distinct key among ``links``."""
+        for key in dict.fromkeys(link_key(link) for link in links):
+            self._items.setdefault(key, []).append(item)
+
+    def get(self, link: str) -> list:
+        return self._items.get(link_key(link), [])
+
+    def __contains__(self, link) -> bool:
+        return link_key(link) in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def match_report(self, links) -> dict:
+        """How many of ``links`` have an offer id and how many find a match."""
+        total = with_id = matched = 0
+        for link in links:
+            total += 1
+            key = offer_id(link)
+            with_id += key is not None
+            matched += (key or link or "") in self._items
+        return {
+            "links": total,
+            "with_offer_id": with_id,
+            "matched": matched,
+            "match_rate": round(matched / total, 4) if total else None,
+        }
@@ -0,0 +1,110 @@
+"""Offline parsers for InfoJobs offer and application-form pages."""
+
+from __future__ import annotations
+
+import logging
+import re
+
+from bs4 import BeautifulSoup
+
+from .forms import parse_fieldsets
+from .records import FormPage, OfferDetail
+
+logger = logging.getLogger(__name__)
+
+
+def _text(el) -> str:
+    """Whitespace-normalized text of ``el``, close to WebElement.text for one-liners."""
+    if el is None:
+        return ""
+    return " ".join(el.get_text(" ").split())
+
+
+def _dl_pairs(dl):
+    return zip(dl.find_all("dt"), dl.find_all("dd"))
+
+
+def _dl_key(dt) -> str:
+    return dt.get_text(strip=True).lower().replace(" ", "_")
+
+
+def _soup(html):
+    return html if isinstance(html, BeautifulSoup) else BeautifulSoup(html, "lxml")
+
+
+def parse_offer_detail(html) -> OfferDetail:
+    """Parse an offer detail page snapshot (``driver.page_source``)."""
+    soup = _soup(html)
+    data = {}
+
+    title = soup.select_one("div[class*='OfferDetailHeader-title'] h1")
+    data["title"] = _text(title)
+    logger.debug("Title located %s", data["title"])
+
+    company_name = soup.select_one("div[class*='companyLogo-companyName']")
+    data["company_name"] = _text(company_name)
+    logger.debug("Company located %s", data["company_name"])
+
+    rating_company = soup.select_one("p[class*='sui-MoleculeRating-label']")
+    data["rating_company"] = _text(rating_company)
+
+    details = soup.select(
+        "div[class*='OfferDetailHeader-detailsList'] "
+        "div[class*='OfferDetailHeader-detailsList-item']"
+    )
+    data["details"] = [_text(d) for d in details]
+    logger.debug("Found %s details", len(details))
+
+    data["publicada"] = _text(soup.select_one("span[data-testid='sincedate-tag']"))
+    logger.debug("Found date %s", data["publicada"])
+
+    req = {}
+    req_block = soup.find("h3", string="Requisitos").find_next("dl")
+    for dt, dd in _dl_pairs(req_block):
+        req[_dl_key(dt)] = dd.get_text("\n", strip=True)
+    data["requisitos"] = req
+    logger.debug("Found %s requirements", len(req))
+
+    desc_block = soup.find("h3", string="Descripción")
+    desc = ""
+    for el in desc_block.next_sibling():
+        desc += el.get_text("\n") + "\n"
+    desc = re.sub(r"(\n){2,}", r"\1\1", desc).strip()
+    data["descripcion"] = desc
+    logger.debug("Found description block of %s chars", len(desc))
+
+    cond = {}
+    details_dl = desc_block.find_next("dl")
+    for dt, dd in _dl_pairs(details_dl):
+        key = _dl_key(dt)
+        if dd.find_all("a"):
+            cond[key] = [a.get_text("\n", strip=True) for a in dd.find_all("a")]
+        else:
+            cond[key] = dd.get_text("\n", strip=True)
+    data["condiciones"] = cond
+    logger.debug("Found %s conditions", len(cond))
+
+    footer = soup.find(
+        "h3",
+        string=lambda s: s
+        and ("inscritos" in s.lower() or "vacantes" in s.lower()),
+    )
+    data["inscritos"] = footer.get_text(strip=True)
+    return OfferDetail.from_dict(data)
+
+
+def parse_form(html) -> FormPage:
+    """Parse an apply-form page snapshot: form text, offer data and questions."""
+    soup = _soup(html)
+    form = soup.find("form", id="myForm")
+    form_text = re.sub(r"(\n){2,}", r"\1\1", form.get_text("\n").strip())
+    reqs = {}
+    reqs_block = soup.find("h3", string="Datos de la oferta")
+    if reqs_block:
+        reqs_dl = reqs_block.find_next("dl")
+        for dt, dd in _dl_pairs(reqs_dl):
+            reqs[_dl_key(dt)] = dd.get_text("\n", strip=True)
+    logger.debug("Found %s requirements at offer form page", len(reqs))
+    # the fieldset parser runs on lxml; hand it markup, not the soup
+    markup = str(html) if isinstance(html, BeautifulSoup) else html
+    return FormPage(form_text, reqs, parse_fieldsets(markup))
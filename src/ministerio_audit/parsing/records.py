@@ -0,0 +1,185 @@
+"""Typed records for offers, forms, application pages and consult rows.
+
+Records are slotted dataclasses: no per-instance ``__dict__``, and the
+categorical string fields listed in ``_interned`` (run and CV ids,
+companies, event texts) are interned by ``from_dict``, so many runs held in
+memory share one copy of each value. ``to_columns``/``from_columns`` convert
+lists of records to and from column lists for pandas or Arrow without a
+dict per row.
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+from dataclasses import dataclass, field, fields
+from functools import cache
+from operator import attrgetter
+
+logger = logging.getLogger(__name__)
+
+
+@cache
+def _names(cls) -> tuple[str, ...]:
+    return tuple(f.name for f in fields(cls))
+
+
+def _plain(value):
+    if isinstance(value, _Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+class _Record:
+    __slots__ = ()
+    # string fields interned by from_dict
+    _interned = ()
+    # fields holding a record (or a list of them): field -> record class
+    _nested = {}
+
+    def get(self, name: str, default=None):
+        """Dict-style access, so consumers of run file dicts accept records too."""
+        return getattr(self, name, default)
+
+    def to_dict(self) -> dict:
+        """Plain dict with the keys the run YAML/JSONL files have always used."""
+        data = {name: _plain(getattr(self, name)) for name in _names(type(self))}
+        if data.get("extra"):
+            data.update(data.pop("extra"))
+        else:
+            data.pop("extra", None)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Build a record from a run file dict; unknown keys go to ``extra``."""
+        names = _names(cls)
+        kwargs = {key: value for key, value in data.items() if key in names and key != "extra"}
+        if len(kwargs) != len(data):
+            extra = {key: value for key, value in data.items() if key not in kwargs}
+            if "extra" in names:
+                kwargs["extra"] = extra
+            else:
+                logger.debug("Dropping unknown %s keys %s", cls.__name__, sorted(extra))
+        for key in cls._interned:
+            value = kwargs.get(key)
+            if type(value) is str:
+                kwargs[key] = sys.intern(value)
+        for key, nested in cls._nested.items():
+            value = kwargs.get(key)
+            if isinstance(value, dict):
+                kwargs[key] = nested.from_dict(value)
+            elif isinstance(value, list):
+                kwargs[key] = [nested.from_dict(v) if isinstance(v, dict) else v for v in value]
+        return cls(**kwargs)
+
+
+def to_columns(records, cls=None, plain: bool = True) -> dict[str, list]:
+    """Column lists of ``records``.
+
+    Nested records become dicts unless ``plain`` is False, which skips that
+    conversion for consumers that only read them (pandas, ``explode_events``).
+    """
+    records = list(records)
+    if cls is None:
+        if not records:
+            return {}
+        cls = type(records[0])
+    columns = {}
+    for name in _names(cls):
+        values = list(map(attrgetter(name), records))
+        if (plain and name in cls._nested) or name == "extra":
+            values = [_plain(value) for value in values]
+        columns[name] = values
+    return columns
+
+
+def from_columns(cls, columns: dict) -> list:
+    """Inverse of ``to_columns``; values are interned and nested as in ``from_dict``."""
+    names = [name for name in _names(cls) if name in columns]
+    records = []
+    for row in zip(*(columns[name] for name in names)):
+        data = dict(zip(names, row))
+        extra = data.pop("extra", None)
+        if extra:
+            data.update(extra)
+        records.append(cls.from_dict(data))
+    return records
+
+
+@dataclass(slots=True)
+class OfferDetail(_Record):
+    _interned = ("company_name", "rating_company")
+
+    title: str = ""
+    company_name: str = ""
+    rating_company: str = ""
+    details: list[str] = field(default_factory=list)
+    publicada: str = ""
+    requisitos: dict[str, str] = field(default_factory=dict)
+    descripcion: str = ""
+    condiciones: dict[str, str | list[str]] = field(default_factory=dict)
+    inscritos: str = ""
+
+
+@dataclass(slots=True)
+class FormPage(_Record):
+    form_text: str = ""
+    requirements: dict[str, str] = field(default_factory=dict)
+    fieldsets: list[dict] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class ApplicationEvent(_Record):
+    _interned = ("text",)
+
+    text: str = ""
+    time: str = ""
+
+
+@dataclass(slots=True)
+class ApplicationPage(_Record):
+    _interned = ("job_subtitle", "job_subtitle_href")
+    _nested = {"events": ApplicationEvent}
+
+    job_title: str = ""
+    offer_link: str = ""
+    job_subtitle: str | None = None
+    job_subtitle_href: str | None = None
+    job_details: list[str] = field(default_factory=list)
+    next_div: str = ""
+    all_job_desc: str = ""
+    events: list[ApplicationEvent] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class ApplicationListItem(_Record):
+    url: str = ""
+    fingerprint: str = ""
+
+
+@dataclass(slots=True)
+class ConsultRecord(_Record):
+    """One consulted application, as written by consult_offers."""
+
+    _interned = ("run_id", "cv_id", "timestamp", "job_subtitle", "job_subtitle_href")
+    _nested = {"events": ApplicationEvent}
+
+    run_id: str | None = None
+    cv_id: str | None = None
+    url: str = ""
+    timestamp: str | None = None
+    job_title: str = ""
+    offer_link: str = ""
+    job_subtitle: str | None = None
+    job_subtitle_href: str | None = None
+    job_details: list[str] = field(default_factory=list)
+    next_div: str = ""
+    all_job_desc: str = ""
+    events: list[ApplicationEvent] = field(default_factory=list)
+    # delta fields of incremental consults and other unknown keys
+    extra: dict = field(default_factory=dict)
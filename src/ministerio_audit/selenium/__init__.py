@@ -1,3 +1,5 @@
 """Selenium automation helpers."""
 from .actions import login_infojobs, logout_infojobs, submit_query_infojobs, get_form_text
-from .scrape import get_offer_elements, get_offer_details, save_offers_data, parse_fieldsets, scrape_application
+from .scrape import get_offer_elements, get_offer_details, save_offers_data, scrape_application
+from ministerio_audit.parsing import parse_fieldsets
+from .session import SessionStore, clear_cookies, ensure_login, end_session, is_logged_in, logged_in_as
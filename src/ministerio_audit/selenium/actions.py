@@ -3,24 +3,31 @@
 from __future__ import annotations
 
 import logging
-import re
 from typing import Tuple
 import requests
 import undetected_chromedriver as uc
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from time import sleep
-from bs4 import BeautifulSoup
-from ministerio_audit.config import INFOJOBS_LOGIN, INFOJOBS_MAIN
-from .scrape import get_offer_details
+from ministerio_audit.config import INFOJOBS_BASE, INFOJOBS_LOGIN, INFOJOBS_MAIN, INFOJOBS_PUBLIC
+from ministerio_audit.parsing import parse_form
+from ministerio_audit.storage.archive import archive_page
+from . import metrics
+from .metrics import timed
+from .pacing import pause
+from .scrape import OFFER_ITEM_XPATH, get_offer_details
 
 logger = logging.getLogger(__name__)
 TIME_WAIT = 20
-TIME_SLEEP = 4
+
+def infojobs_url(url: str) -> str:
+    """Point a recorded infojobs.net URL at ``INFOJOBS_BASE``."""
+    if INFOJOBS_BASE != INFOJOBS_PUBLIC and url.startswith(INFOJOBS_PUBLIC):
+        return INFOJOBS_BASE + url[len(INFOJOBS_PUBLIC):]
+    return url
+
 
 def accept_cookies(driver, wait):
     try:
@@ -32,8 +39,9 @@ def accept_cookies(driver, wait):
         return False
 
 
-def login_infojobs(driver, email, password, SLEEP=TIME_SLEEP, max_attempts=3):
-    wait = WebDriverWait(driver, TIME_WAIT)
+@timed("login")
+def login_infojobs(driver, email, password, SLEEP=None, max_attempts=3):
+    wait = metrics.wait(driver, TIME_WAIT)
     last_error = None
     for attempt in range(max_attempts):
         try:
@@ -54,11 +62,11 @@ def login_infojobs(driver, email, password, SLEEP=TIME_SLEEP, max_attempts=3):
             input_email.send_keys(Keys.CONTROL, "a")
             input_email.send_keys(Keys.DELETE)
             input_email.send_keys(email)
-            sleep(SLEEP)
+            pause("keystroke", SLEEP)
             wait.until(
                 EC.visibility_of_element_located((By.NAME, "password"))
             ).send_keys(password)
-            sleep(SLEEP)
+            pause("keystroke", SLEEP)
             wait.until(
                 EC.element_to_be_clickable(
                     (By.XPATH,
@@ -81,13 +89,14 @@ def login_infojobs(driver, email, password, SLEEP=TIME_SLEEP, max_attempts=3):
         except (TimeoutException, NoSuchElementException) as exc:
             last_error = exc
             logger.warning("Login attempt %s/%s failed, retrying.", attempt+1, max_attempts)
-            sleep(SLEEP)
+            pause("retry", SLEEP)
     raise last_error
     
 
 
+@timed("logout")
 def logout_infojobs(driver):
-    wait = WebDriverWait(driver, TIME_WAIT)
+    wait = metrics.wait(driver, TIME_WAIT)
     wait.until(
         EC.visibility_of_element_located(
             (By.CSS_SELECTOR, "div[class='ij-HeaderDesktop-navbar-avatar']"))
@@ -100,7 +109,8 @@ def logout_infojobs(driver):
     logout.click()
 
 
-def get_form_text(driver, wait, go_back=True):
+@timed("form")
+def get_form_text(driver, wait, go_back=True, archive=None):
     logger.debug("Waiting for apply button to appear")
     wait.until(
         EC.visibility_of_element_located(
@@ -114,28 +124,18 @@ def get_form_text(driver, wait, go_back=True):
         )
     )
     logger.debug("Form parsing")
-    soup = BeautifulSoup(driver.page_source, "lxml")
-    form = soup.find("form", id="myForm")
-    form = re.sub(r"(\n){2,}", r"\1\1", form.get_text("\n").strip())
-    logger.debug("Form parsing")
+    page = parse_form(archive_page(archive, driver, "form"))
     if go_back:
         logger.info("Going back from form offer")
         driver.back()
-    reqs = {}
-    reqs_block = soup.find("h3", string="Datos de la oferta")  # TODO: correct offer scraping, now tthis function returns two values!!!
-    if reqs_block:
-        reqs_dl = reqs_block.find_next("dl")
-        for dt, dd in zip(reqs_dl.find_all("dt"), reqs_dl.find_all("dd")):
-            key = dt.get_text(strip=True).lower().replace(" ", "_")
-            reqs[key] = dd.get_text("\n", strip=True)
-    logging.debug("Found %s requirements at offer form page" % str(len(reqs)))
-    return form, reqs
+    return page.form_text, page.requirements
 
-def applybutton_offer_infojobs(driver) -> Tuple:
+
+def applybutton_offer_infojobs(driver, archive=None) -> Tuple:
     """Apply to a specific offer URL."""
-    wait = WebDriverWait(driver, TIME_WAIT)
+    wait = metrics.wait(driver, TIME_WAIT)
     logger.debug("Waiting for apply offer button")
-    form_text, reqs = get_form_text(driver, wait, go_back=False)
+    form_text, reqs = get_form_text(driver, wait, go_back=False, archive=archive)
     #apply_button = wait.until(
     #    EC.visibility_of_element_located(
     #        (By.XPATH, "//div[contains(@class, 'OfferDetailApplyButton')]")
@@ -147,20 +147,41 @@ def applybutton_offer_infojobs(driver) -> Tuple:
     return form_text, reqs
 
 
-def load_offer_infojobs(driver, url):
+@timed("load_offer")
+def load_offer_infojobs(driver, url, archive=None):
     """Apply to a specific offer URL."""
-    wait = WebDriverWait(driver, TIME_WAIT)
-    driver.get(url)
+    wait = metrics.wait(driver, TIME_WAIT)
+    driver.get(infojobs_url(url))
     logger.info("Loading for offer %s" % url)
     wait.until(EC.visibility_of_element_located((By.TAG_NAME, "body")))
     logger.debug("Scraping details")
-    data = get_offer_details(driver, wait)
+    data = get_offer_details(driver, wait, archive=archive)
     return data
 
 
+def scroll_until_stable(driver, item_xpath=OFFER_ITEM_XPATH, max_rounds=5, settle=3):
+    """Scroll to the bottom until no new ``item_xpath`` elements load.
+
+    Replaces fixed scroll+sleep cycles: each round waits at most ``settle``
+    seconds for the item count to grow and stops as soon as it does not.
+    """
+    count = len(driver.find_elements(By.XPATH, item_xpath))
+    for _ in range(max_rounds):
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        try:
+            metrics.wait(driver, settle).until(
+                lambda d: len(d.find_elements(By.XPATH, item_xpath)) > count
+            )
+        except TimeoutException:
+            break
+        count = len(driver.find_elements(By.XPATH, item_xpath))
+        pause("scroll")
+    return count
+
+
 def submit_query_infojobs(driver, key, loc):
     """Search for offers using a query string."""
-    wait = WebDriverWait(driver, 10)
+    wait = metrics.wait(driver, 10)
     
     input_key = wait.until(
         EC.visibility_of_element_located((By.ID, "keyword-autocomplete"))
@@ -203,6 +224,7 @@ def submit_query_infojobs(driver, key, loc):
     )
 
 
+@timed("fieldsets")
 def populate_fieldsets_infojobs(driver, fieldsets, cv_id, offer_id=None):
     trace = []
     for fieldset in fieldsets:
@@ -242,9 +264,10 @@ def populate_fieldsets_infojobs(driver, fieldsets, cv_id, offer_id=None):
     return trace
 
 
+@timed("optional")
 def populate_optional_infojobs(driver, cv_path, letter):
     trace = {"cv": None, "letter": None}
-    wait = WebDriverWait(driver, TIME_WAIT)
+    wait = metrics.wait(driver, TIME_WAIT)
 
     try:
         file_input = wait.until(
@@ -0,0 +1,222 @@
+"""Two-phase crawl of InfoJobs search results.
+
+First every result link is collected across pagination, then the detail
+pages are fetched through a pool of browser tabs: while one tab is parsed
+the others are already loading, and no ``driver.back()`` round-trip back to
+the results list is needed. Progress is appended to a JSON Lines file so an
+interrupted crawl resumes where it stopped.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections import deque
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+from ministerio_audit.parsing.links import offer_id
+from ministerio_audit.storage import RecordWriter, iter_records
+from . import metrics
+from .actions import TIME_WAIT, get_form_text, scroll_until_stable
+from .pacing import pause
+from .scrape import get_offer_details, get_offer_elements
+
+logger = logging.getLogger(__name__)
+
+NEXT_PAGE_XPATH = (
+    "//li[contains(@class, 'sui-MoleculePagination-item')]/button"
+    "[.//span[normalize-space()='Siguiente']]"
+)
+# set on the old document before navigating; the new document does not have it
+_STALE_FLAG = "__ministerioStale"
+
+
+def offer_key(link: str) -> str:
+    """Offer id of ``link``, or the link without query string or fragment."""
+    key = offer_id(link)
+    if key:
+        return key
+    parts = urlsplit(link)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path.rstrip("/"), "", ""))
+
+
+def collect_offer_links(driver, page_offers):
+    links = []
+    for offer in page_offers:
+        href = offer.find_element(
+            By.XPATH, ".//h2[contains(@id, 'job-title')]/a"
+        ).get_property("href")
+        links.append(href)
+    return links
+
+
+def go_next_page(driver, wait) -> bool:
+    """Click "Siguiente" and wait for the new results; False on the last page."""
+    try:
+        next_button = wait.until(
+            EC.element_to_be_clickable((By.XPATH, NEXT_PAGE_XPATH))
+        )
+    except TimeoutException:
+        return False
+    first_offer = get_offer_elements(driver, wait)[0]
+    next_button.click()
+    wait.until(EC.staleness_of(first_offer))
+    pause("page_settle")
+    return True
+
+
+def collect_result_links(driver, wait, max_pages=None, skip=()):
+    """Walk every results page and return the new offer links in order.
+
+    Links whose ``offer_key`` is in ``skip`` (or repeats within the search)
+    are dropped.
+    """
+    seen = set(skip)
+    links = []
+    page = 0
+    while True:
+        page += 1
+        scroll_until_stable(driver)
+        for link in collect_offer_links(driver, get_offer_elements(driver, wait)):
+            key = offer_key(link)
+            if key not in seen:
+                seen.add(key)
+                links.append(link)
+        logger.info("Results page %s: %s new links so far", page, len(links))
+        if max_pages and page >= max_pages:
+            break
+        if not go_next_page(driver, wait):
+            break
+    return links
+
+
+class CrawlProgress:
+    """State of one crawl run: the collected link queue and fetched offers."""
+
+    def __init__(self, run_dir: Path):
+        self.run_dir = Path(run_dir)
+        self.links_path = self.run_dir / "links.json"
+        self.offers_path = self.run_dir / "offers.jsonl"
+
+    def load_links(self):
+        if not self.links_path.exists():
+            return None
+        with self.links_path.open(encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_links(self, links):
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.links_path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(links, f, ensure_ascii=False, indent=0)
+        os.replace(tmp, self.links_path)
+
+    def records(self):
+        if not self.offers_path.exists():
+            return []
+        return list(iter_records(self.offers_path))
+
+    def done(self) -> set[str]:
+        return {offer_key(r["link"]) for r in self.records() if not r.get("error")}
+
+    def writer(self) -> RecordWriter:
+        return RecordWriter(self.offers_path)
+
+
+def previously_scraped(roots, exclude: Path | None = None) -> set[str]:
+    """Offer keys already scraped by earlier crawls under any of ``roots``.
+
+    Reads crawl runs (``<run>/offers.jsonl``), the JSON dumps written by
+    ``save_offers_data`` (``infojobs_offers_*.json``) and the JSON Lines of
+    ``OfferSink`` crawls, finalized or not, skipping the ``exclude`` run
+    directory.
+    """
+    keys = set()
+    for root in map(Path, roots):
+        for path in (*root.glob("*/offers.jsonl"), *root.glob("infojobs_offers_*.jsonl")):
+            if path.parent == exclude:
+                continue
+            keys.update(
+                offer_key(r["link"]) for r in iter_records(path) if not r.get("error")
+            )
+        for pattern in ("infojobs_offers_*.json", "*/infojobs_offers_*.json"):
+            for path in root.glob(pattern):
+                if path.parent == exclude:
+                    continue
+                with path.open(encoding="utf-8") as f:
+                    keys.update(offer_key(r["link"]) for r in json.load(f) if r.get("link"))
+    return keys
+
+
+def _navigate(driver, handle, link):
+    driver.switch_to.window(handle)
+    driver.execute_script(
+        f"window.{_STALE_FLAG} = true; window.location.href = arguments[0];", link
+    )
+
+
+def _scrape_loaded_offer(driver, wait, link, archive=None):
+    wait.until(
+        lambda d: d.execute_script(
+            f"return !window.{_STALE_FLAG} && document.readyState !== 'loading';"
+        )
+    )
+    data = get_offer_details(driver, wait, archive=archive)
+    data["link"] = link
+    try:
+        data["form_text"] = get_form_text(driver, wait, go_back=False, archive=archive)
+    except Exception:
+        pause("retry")
+        data["form_text"] = get_form_text(driver, wait, go_back=False, archive=archive)
+    return data
+
+
+def prefetch_offers(driver, links, on_result, tabs=3, archive=None):
+    """Scrape ``links`` through ``tabs`` browser tabs, loading ahead.
+
+    ``on_result(link, data, error)`` is called once per link, in order of
+    completion. Extra tabs are closed afterwards and the driver is left on
+    the original one.
+    """
+    wait = metrics.wait(driver, TIME_WAIT)
+    main_handle = driver.current_window_handle
+    handles = [main_handle]
+    for _ in range(max(1, tabs) - 1):
+        driver.switch_to.new_window("tab")
+        handles.append(driver.current_window_handle)
+
+    queue = deque(links)
+    in_flight = deque()
+    try:
+        for handle in handles:
+            if not queue:
+                break
+            link = queue.popleft()
+            _navigate(driver, handle, link)
+            in_flight.append((handle, link))
+        while in_flight:
+            handle, link = in_flight.popleft()
+            driver.switch_to.window(handle)
+            data = error = None
+            try:
+                data = _scrape_loaded_offer(driver, wait, link, archive)
+            except Exception as exc:
+                logger.exception("Failed to scrape %s", link)
+                error = repr(exc)
+            on_result(link, data, error)
+            if queue:
+                next_link = queue.popleft()
+                _navigate(driver, handle, next_link)
+                in_flight.append((handle, next_link))
+            pause("between_offers")
+    finally:
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(main_handle)
@@ -0,0 +1,215 @@
+"""Per-step timing of the Selenium flows, written as one JSON Lines file per run.
+
+``span(name, **tags)`` (or the ``timed(name)`` decorator) measures a step:
+wall time, time blocked in waits, pacing pauses, retries and WebDriver
+round trips. Spans nest per thread; counters of a step also count towards
+every enclosing span, so a ``job`` span holds the totals of its steps.
+Nothing is recorded until ``configure`` sets the run's metrics file, drivers
+only count round trips once passed through ``instrument``, and only waits
+built by ``wait`` count towards ``wait_seconds``.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+
+from ministerio_audit.config import RUNS_DIR
+from ministerio_audit.storage.records import RecordWriter, iter_records
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = RUNS_DIR / "metrics"
+COUNTERS = ("wait_seconds", "pause_seconds", "retries", "rpc", "rpc_seconds")
+
+_local = threading.local()
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _stack() -> list:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def add(counter: str, value: float = 1):
+    """Add ``value`` to ``counter`` of every open span of this thread."""
+    for frame in _stack():
+        frame["counters"][counter] += value
+
+
+def configure(run: str, root: Path = METRICS_DIR) -> Path:
+    """Record spans of this process to ``root/<run>.jsonl``."""
+    global _writer
+    path = Path(root) / f"{run}.jsonl"
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+        _writer = RecordWriter(path, fsync_every=64)
+    return path
+
+
+def close():
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+
+
+def _emit(record: dict):
+    with _writer_lock:
+        if _writer is not None:
+            _writer.append(record)
+
+
+@contextmanager
+def span(name: str, **tags):
+    """Time the enclosed step; tags are inherited by nested spans."""
+    stack = _stack()
+    if _writer is None:
+        yield
+        return
+    parent_tags = stack[-1]["tags"] if stack else {}
+    frame = {"tags": {**parent_tags, **tags}, "counters": defaultdict(float)}
+    stack.append(frame)
+    started = datetime.now().isoformat(timespec="milliseconds")
+    start = perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as exc:
+        error = repr(exc)
+        raise
+    finally:
+        wall = perf_counter() - start
+        stack.pop()
+        counters = frame["counters"]
+        record = {"step": name, **frame["tags"], "start": started, "wall_seconds": round(wall, 4)}
+        for counter in COUNTERS:
+            value = counters.get(counter, 0)
+            record[counter] = round(float(value), 4) if counter.endswith("_seconds") else int(value)
+        record["ok"] = error is None
+        if error:
+            record["error"] = error
+        _emit(record)
+
+
+def timed(name: str):
+    """Decorator form of ``span``."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument(driver):
+    """Count WebDriver round trips of ``driver`` (element calls included)."""
+    if getattr(driver, "_metrics_instrumented", False):
+        return driver
+    execute = driver.execute
+
+    def counted(driver_command, params=None):
+        start = perf_counter()
+        try:
+            return execute(driver_command, params)
+        finally:
+            add("rpc")
+            add("rpc_seconds", perf_counter() - start)
+
+    driver.execute = counted
+    driver._metrics_instrumented = True
+    return driver
+
+
+@functools.cache
+def _timed_wait_class():
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    class TimedWait(WebDriverWait):
+        """``WebDriverWait`` counting the time blocked in ``until``/``until_not``."""
+
+        def until(self, *args, **kwargs):
+            start = perf_counter()
+            try:
+                return super().until(*args, **kwargs)
+            finally:
+                add("wait_seconds", perf_counter() - start)
+
+        def until_not(self, *args, **kwargs):
+            start = perf_counter()
+            try:
+                return super().until_not(*args, **kwargs)
+            finally:
+                add("wait_seconds", perf_counter() - start)
+
+    return TimedWait
+
+
+def wait(driver, timeout: float, **kwargs):
+    """A ``WebDriverWait`` on ``driver`` whose waits count as ``wait_seconds``."""
+    return _timed_wait_class()(driver, timeout, **kwargs)
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(path: Path) -> dict:
+    """Aggregate a metrics file per step name."""
+    steps = defaultdict(lambda: {"wall": [], "failed": 0, **{c: 0.0 for c in COUNTERS}})
+    for record in iter_records(path):
+        step = steps[record["step"]]
+        step["wall"].append(record["wall_seconds"])
+        step["failed"] += not record.get("ok", True)
+        for counter in COUNTERS:
+            step[counter] += record.get(counter, 0)
+    summary = {}
+    for name, step in sorted(steps.items(), key=lambda kv: -sum(kv[1]["wall"])):
+        wall = step["wall"]
+        summary[name] = {
+            "count": len(wall),
+            "failed": step["failed"],
+            "wall_seconds": round(sum(wall), 2),
+            "wall_mean": round(sum(wall) / len(wall), 3),
+            "wall_p50": round(_percentile(wall, 0.5), 3),
+            "wall_p95": round(_percentile(wall, 0.95), 3),
+            "wait_seconds": round(step["wait_seconds"], 2),
+            "pause_seconds": round(step["pause_seconds"], 2),
+            "retries": int(step["retries"]),
+            "rpc": int(step["rpc"]),
+            "rpc_seconds": round(step["rpc_seconds"], 2),
+        }
+    return summary
+
+
+def write_summary(path: Path) -> dict:
+    """Write ``summarize(path)`` next to the metrics file and log it."""
+    path = Path(path)
+    summary = summarize(path)
+    with path.with_suffix(".summary.json").open("w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    for name, step in summary.items():
+        logger.info(
+            "Step %-14s n=%-4s wall=%8.1fs p50=%6.2fs p95=%6.2fs wait=%7.1fs "
+            "pause=%7.1fs retries=%-3s rpc=%s",
+            name, step["count"], step["wall_seconds"], step["wall_p50"], step["wall_p95"],
+            step["wait_seconds"], step["pause_seconds"], step["retries"], step["rpc"],
+        )
+    return summary
@@ -0,0 +1,101 @@
+"""Randomized, per-action pauses for the Selenium flows.
+
+Every deliberate delay goes through ``pause(action)``. Delay ranges per
+action live in ``PROFILES``: ``stealth`` paces like a person for production
+runs and ``fast`` keeps the local test harness quick. The active profile is
+chosen with ``set_profile`` or the ``PACING_PROFILE`` environment variable,
+and each pause is logged so run logs show where the time went.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+from collections import defaultdict
+from time import sleep
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# (min, max) seconds per action type
+PROFILES = {
+    "stealth": {
+        "keystroke": (1.5, 4.0),
+        "after_login": (2.0, 5.0),
+        "page_settle": (1.0, 3.0),
+        "scroll": (0.5, 1.5),
+        "between_offers": (3.0, 7.0),
+        "between_accounts": (4.0, 9.0),
+        "retry": (4.0, 8.0),
+    },
+    "fast": {
+        "keystroke": (0.0, 0.05),
+        "after_login": (0.0, 0.1),
+        "page_settle": (0.0, 0.1),
+        "scroll": (0.0, 0.05),
+        "between_offers": (0.0, 0.1),
+        "between_accounts": (0.0, 0.1),
+        "retry": (0.1, 0.3),
+    },
+}
+DEFAULT_PROFILE = "stealth"
+
+
+class PacingPolicy:
+    def __init__(self, name: str, delays: dict, seed=None):
+        self.name = name
+        self.delays = dict(delays)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.totals = defaultdict(float)
+        self.counts = defaultdict(int)
+
+    def delay(self, action: str) -> float:
+        low, high = self.delays.get(action, self.delays["page_settle"])
+        with self._lock:
+            return self._rng.uniform(low, high)
+
+    def pause(self, action: str, seconds: float | None = None) -> float:
+        """Sleep for ``action``; a fixed ``seconds`` overrides the profile."""
+        seconds = self.delay(action) if seconds is None else seconds
+        logger.debug("Pacing %s: %.2fs (%s)", action, seconds, self.name)
+        with self._lock:
+            self.totals[action] += seconds
+            self.counts[action] += 1
+        metrics.add("pause_seconds", seconds)
+        if action == "retry":
+            metrics.add("retries")
+        sleep(seconds)
+        return seconds
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                action: {"count": self.counts[action], "seconds": round(total, 2)}
+                for action, total in sorted(self.totals.items())
+            }
+
+
+_policy = None
+
+
+def set_profile(name: str, seed=None) -> PacingPolicy:
+    global _policy
+    if name not in PROFILES:
+        raise ValueError(f"Unknown pacing profile {name!r}; expected one of {sorted(PROFILES)}")
+    _policy = PacingPolicy(name, PROFILES[name], seed=seed)
+    logger.info("Pacing profile %s: %s", name, PROFILES[name])
+    return _policy
+
+
+def get_policy() -> PacingPolicy:
+    if _policy is None:
+        set_profile(os.environ.get("PACING_PROFILE", DEFAULT_PROFILE))
+    return _policy
+
+
+def pause(action: str, seconds: float | None = None) -> float:
+    return get_policy().pause(action, seconds)
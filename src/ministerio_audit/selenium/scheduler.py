@@ -0,0 +1,125 @@
+"""Run (cv_id, offer_id) jobs on isolated browsers, one account per worker."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from ministerio_audit.config import CHROMEDRIVER_PATH, RUNS_DIR
+
+logger = logging.getLogger(__name__)
+
+PROFILES_DIR = RUNS_DIR / "selenium" / "profiles"
+
+# undetected_chromedriver patches the driver binary on start; do not race it
+_driver_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Job:
+    cv_id: str
+    offer_id: str
+
+
+@dataclass
+class JobResult:
+    job: Job
+    ok: bool
+    data: Any = None
+    error: str | None = None
+
+
+@dataclass
+class AccountHooks:
+    """Callbacks that drive one account's browser.
+
+    ``start(driver, cv_id)`` logs in, ``run(driver, job)`` performs one job
+    and returns its data, ``finish(driver, cv_id, results)`` logs out or
+    saves. Only ``run`` is required.
+    """
+
+    run: Callable
+    start: Callable | None = None
+    finish: Callable | None = None
+
+
+def chrome_factory(cv_id: str, profiles_dir: Path = PROFILES_DIR, headless=False):
+    """Start an undetected Chrome with a persistent profile for ``cv_id``."""
+    import undetected_chromedriver as uc
+    from selenium.webdriver.chrome.service import Service
+
+    profile = Path(profiles_dir) / cv_id
+    profile.mkdir(parents=True, exist_ok=True)
+    with _driver_lock:
+        return uc.Chrome(
+            service=Service(CHROMEDRIVER_PATH),
+            use_subprocess=False,
+            user_data_dir=str(profile),
+            headless=headless,
+        )
+
+
+def group_by_account(jobs) -> dict[str, list[Job]]:
+    accounts = {}
+    for job in jobs:
+        accounts.setdefault(job.cv_id, []).append(job)
+    return accounts
+
+
+def _run_account(cv_id, jobs, hooks: AccountHooks, driver_factory):
+    results = []
+    driver = driver_factory(cv_id)
+    try:
+        if hooks.start:
+            hooks.start(driver, cv_id)
+        for job in jobs:
+            try:
+                results.append(JobResult(job, True, hooks.run(driver, job)))
+            except Exception as exc:
+                logger.exception("Job %s/%s failed", job.cv_id, job.offer_id)
+                results.append(JobResult(job, False, error=repr(exc)))
+        if hooks.finish:
+            try:
+                hooks.finish(driver, cv_id, results)
+            except Exception:
+                logger.exception("Closing account %s failed", cv_id)
+    finally:
+        driver.quit()
+    return results
+
+
+def run_jobs(jobs, hooks: AccountHooks, driver_factory=chrome_factory, max_workers=1):
+    """Run ``jobs`` with at most ``max_workers`` browsers at once.
+
+    Jobs of one account always run in order on the same browser, so an
+    account is never logged in twice; different accounts run in parallel.
+    ``driver_factory(cv_id)`` builds the WebDriver, which lets tests pass a
+    fake driver or point a real one at a local stand-in site. Returns the
+    ``JobResult`` list in the order of ``jobs``.
+    """
+    jobs = list(jobs)
+    accounts = group_by_account(jobs)
+    by_job = {}
+    with ThreadPoolExecutor(
+        max_workers=max(1, max_workers), thread_name_prefix="browser"
+    ) as pool:
+        futures = {
+            pool.submit(_run_account, cv_id, account_jobs, hooks, driver_factory): cv_id
+            for cv_id, account_jobs in accounts.items()
+        }
+        for future in as_completed(futures):
+            cv_id = futures[future]
+            try:
+                account_results = future.result()
+            except Exception as exc:
+                logger.exception("Account %s failed", cv_id)
+                account_results = [
+                    JobResult(job, False, error=repr(exc)) for job in accounts[cv_id]
+                ]
+            for result in account_results:
+                by_job[result.job] = result
+    return [by_job[job] for job in jobs]
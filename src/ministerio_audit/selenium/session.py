@@ -0,0 +1,151 @@
+"""Reuse logged-in InfoJobs sessions across runs instead of logging in again."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+
+from ministerio_audit.config import INFOJOBS_ACCOUNT, INFOJOBS_MAIN, SECRETS_DIR
+from . import metrics
+from .actions import login_infojobs, logout_infojobs
+
+logger = logging.getLogger(__name__)
+
+SESSIONS_DIR = SECRETS_DIR / "sessions"
+SESSION_CHECK_WAIT = 5
+
+
+def is_logged_in(driver, timeout=SESSION_CHECK_WAIT) -> bool:
+    """Check the current page for the logged-in header, waiting at most ``timeout``."""
+    try:
+        metrics.wait(driver, timeout).until(
+            lambda d: d.find_elements(
+                By.CSS_SELECTOR, "div[class='ij-HeaderDesktop-navbar-avatar']"
+            )
+            or d.find_elements(
+                By.XPATH, "//a[contains(@class, 'trackingMainMenuMyApplication')]"
+            )
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+def logged_in_as(driver, email: str) -> bool:
+    """Whether the open session belongs to ``email``.
+
+    Looks for the address on the current page, then on the candidate's CV
+    page, and returns to the main page afterwards.
+    """
+    needle = email.strip().lower()
+    if needle in driver.page_source.lower():
+        return True
+    driver.get(INFOJOBS_ACCOUNT)
+    found = needle in driver.page_source.lower()
+    driver.get(INFOJOBS_MAIN)
+    return found
+
+
+def clear_cookies(driver):
+    """Drop the cookies of every domain; ``delete_all_cookies`` only clears the current one."""
+    try:
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    except (AttributeError, WebDriverException):
+        driver.delete_all_cookies()
+
+
+class SessionStore:
+    """Per-account cookie jars saved as JSON after a successful login.
+
+    Files hold live session cookies, so they live under ``SECRETS_DIR`` and
+    are written with owner-only permissions.
+    """
+
+    def __init__(self, root: Path = SESSIONS_DIR):
+        self.root = Path(root)
+
+    def path(self, cv_id: str) -> Path:
+        return self.root / f"{cv_id}.json"
+
+    def save(self, driver, cv_id: str):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(cv_id)
+        payload = {"saved_at": time.time(), "cookies": driver.get_cookies()}
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle)
+        logger.debug("Saved %s cookies for %s", len(payload["cookies"]), cv_id)
+
+    def restore(self, driver, cv_id: str) -> bool:
+        """Load saved cookies into ``driver``; the page must be on InfoJobs."""
+        path = self.path(cv_id)
+        if not path.exists():
+            return False
+        with path.open(encoding="utf-8") as handle:
+            cookies = json.load(handle).get("cookies", [])
+        now = time.time()
+        restored = 0
+        for cookie in cookies:
+            if cookie.get("expiry") and cookie["expiry"] < now:
+                continue
+            try:
+                driver.add_cookie(cookie)
+                restored += 1
+            except WebDriverException:
+                logger.debug("Skipping cookie %s for %s", cookie.get("name"), cv_id)
+        return restored > 0
+
+    def clear(self, cv_id: str):
+        self.path(cv_id).unlink(missing_ok=True)
+
+
+def ensure_login(driver, cv_id, email, password, store: SessionStore | None = None) -> bool:
+    """Make ``driver`` logged in as ``cv_id``, logging in only when needed.
+
+    Tries, in order, the session already in the browser profile, the saved
+    cookies and finally ``login_infojobs``. A session is only reused, and
+    saved under ``cv_id``, once ``logged_in_as`` confirms it belongs to
+    ``email``. Returns True if a session was reused.
+    """
+    store = store or SessionStore()
+    driver.get(INFOJOBS_MAIN)
+    if is_logged_in(driver):
+        if logged_in_as(driver, email):
+            logger.info("Reusing browser session for %s", cv_id)
+            store.save(driver, cv_id)
+            return True
+        logger.warning("Browser session is not %s's account; dropping it", cv_id)
+        clear_cookies(driver)
+        driver.get(INFOJOBS_MAIN)
+    if store.restore(driver, cv_id):
+        driver.refresh()
+        if is_logged_in(driver) and logged_in_as(driver, email):
+            logger.info("Reusing saved session for %s", cv_id)
+            return True
+        logger.info("Saved session for %s expired or is not its account", cv_id)
+        clear_cookies(driver)
+        store.clear(cv_id)
+    login_infojobs(driver, email, password)
+    store.save(driver, cv_id)
+    return False
+
+
+def end_session(driver, cv_id, store: SessionStore | None = None, logout=False):
+    """Leave the account so the browser can switch to another one.
+
+    By default the session is saved and only the local cookies are dropped,
+    so the next run can reuse it. ``logout=True`` ends it on the server.
+    """
+    store = store or SessionStore()
+    if logout:
+        logout_infojobs(driver)
+        store.clear(cv_id)
+        return
+    store.save(driver, cv_id)
+    clear_cookies(driver)
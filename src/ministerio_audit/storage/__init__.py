@@ -0,0 +1,10 @@
+"""Run storage backends (JSON Lines, YAML, Parquet, Arrow IPC)."""
+from .records import RecordWriter, iter_records
+from .columnar import FORMATS, KINDS, schema, records_to_table, table_to_records
+from .columnar import write_records, read_records, read_table, iter_table_rows, scan_runs, events_table, export_yaml
+from .columnar import iter_columnar_paths, iter_record_paths
+from .yaml_cache import YAML_CACHE_DIR, YamlCache, load_yaml
+from .archive import ARCHIVE_DIR, HtmlArchive, archive_page
+from .journal import ACCOUNT, JOURNAL_DIR, CampaignJournal
+from .snapshots import SNAPSHOT_DIR, ApplicationSnapshots, application_delta
+from .sink import OfferSink, flatten_row
@@ -0,0 +1,83 @@
+"""Content-addressed archive of raw HTML pages visited by the Selenium flows.
+
+Pages are stored once per SHA-256 of their content as
+``objects/<aa>/<digest>.html.gz``; every visit is appended to
+``manifest.jsonl`` with its URL, page kind and timestamp, so parsers can be
+re-run offline over the archive.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from ministerio_audit.config import RUNS_DIR
+from .records import iter_records
+
+ARCHIVE_DIR = RUNS_DIR / "html"
+
+
+class HtmlArchive:
+    def __init__(self, root: Path = ARCHIVE_DIR):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.manifest = self.root / "manifest.jsonl"
+        self._lock = threading.Lock()
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / f"{digest}.html.gz"
+
+    def put(self, html: str, url: str | None = None, kind: str | None = None, **meta) -> str:
+        """Store ``html`` if it is new, record the visit and return its digest."""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(
+                fileobj=raw, mode="wb", mtime=0
+            ) as handle:
+                handle.write(data)
+            os.replace(tmp, path)
+        entry = {
+            "digest": digest,
+            "kind": kind,
+            "url": url,
+            "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
+            **meta,
+        }
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with self.manifest.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return digest
+
+    def get(self, digest: str) -> str:
+        with gzip.open(self.object_path(digest), "rb") as handle:
+            return handle.read().decode("utf-8")
+
+    def entries(self, kind: str | None = None):
+        """Stream manifest entries, optionally only those of ``kind``."""
+        if not self.manifest.exists():
+            return
+        for entry in iter_records(self.manifest):
+            if kind is None or entry.get("kind") == kind:
+                yield entry
+
+
+def archive_page(archive: HtmlArchive | None, driver, kind: str, html: str | None = None):
+    """Archive the driver's current page if an archive is configured.
+
+    Returns the page source so callers can parse the same snapshot.
+    """
+    html = driver.page_source if html is None else html
+    if archive is not None:
+        archive.put(html, url=driver.current_url, kind=kind)
+    return html
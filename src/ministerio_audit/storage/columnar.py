@@ -0,0 +1,291 @@
+"""Columnar (Parquet / Arrow IPC) storage for consult and apply runs.
+
+Records keep the same dict shape the Selenium scripts produce. Free-form
+blobs (``offer_data``, ``form_trace``, ...) and unknown keys are stored as
+JSON strings so every run of a kind shares one schema. A run directory that
+holds columnar files is read from them only; YAML or JSON Lines files next
+to them are exports for human inspection.
+"""
+
+from __future__ import annotations
+
+import json
+from functools import cache
+from pathlib import Path
+
+import yaml
+
+from .records import RecordWriter, iter_records
+from .yaml_cache import YamlCache, load_yaml
+
+FORMATS = ("jsonl", "yaml", "parquet", "arrow")
+SUFFIXES = {"jsonl": ".jsonl", "yaml": ".yaml", "parquet": ".parquet", "arrow": ".arrow"}
+RECORD_SUFFIXES = (".yaml", ".jsonl")
+KINDS = ("application", "trace")
+
+# JSON-encoded columns per record kind
+JSON_COLUMNS = {
+    "application": (),
+    "trace": ("offer_data", "requirements", "form_trace", "optional_trace"),
+}
+EXTRA_COLUMN = "extra"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as exc:  # pragma: no cover - depends on environment
+        raise ImportError(
+            "Columnar storage needs pyarrow; install it with `pip install pyarrow`."
+        ) from exc
+    return pyarrow
+
+
+@cache
+def event_type():
+    pa = _pyarrow()
+    return pa.struct([("text", pa.string()), ("time", pa.string())])
+
+
+@cache
+def schema(kind: str):
+    """Arrow schema for ``kind`` (``application`` or ``trace``)."""
+    pa = _pyarrow()
+    string = pa.string()
+    if kind == "application":
+        fields = [
+            ("run_id", string),
+            ("cv_id", string),
+            ("url", string),
+            ("timestamp", string),
+            ("job_title", string),
+            ("offer_link", string),
+            ("job_subtitle", string),
+            ("job_subtitle_href", string),
+            ("job_details", pa.list_(string)),
+            ("next_div", string),
+            ("all_job_desc", string),
+            ("events", pa.list_(event_type())),
+        ]
+    elif kind == "trace":
+        fields = [
+            ("run_id", string),
+            ("cv_id", string),
+            ("offer_id", string),
+            ("alias", string),
+            ("url", string),
+            ("start_time", string),
+            ("end_time", string),
+            ("already_inscribed", pa.bool_()),
+            ("offer_data", string),
+            ("form_text", string),
+            ("requirements", string),
+            ("form_trace", string),
+            ("optional_trace", string),
+        ]
+    else:
+        raise ValueError(f"Unknown record kind {kind!r}; expected one of {KINDS}")
+    return pa.schema(fields + [(EXTRA_COLUMN, string)])
+
+
+def _dumps(value):
+    if value is None:
+        return None
+    return json.dumps(value, ensure_ascii=False)
+
+
+def records_to_table(records, kind: str, run_id: str | None = None):
+    """Build an Arrow table of ``kind`` from record dicts or typed records."""
+    pa = _pyarrow()
+    table_schema = schema(kind)
+    names = [name for name in table_schema.names if name != EXTRA_COLUMN]
+    json_columns = JSON_COLUMNS[kind]
+    columns = {name: [] for name in table_schema.names}
+    for record in records:
+        if not isinstance(record, dict):
+            record = record.to_dict()
+        for name in names:
+            value = record.get(name)
+            if name == "run_id" and value is None:
+                value = run_id
+            if name in json_columns:
+                value = _dumps(value)
+            columns[name].append(value)
+        extra = {k: v for k, v in record.items() if k not in columns}
+        columns[EXTRA_COLUMN].append(_dumps(extra) if extra else None)
+    return pa.table(columns, schema=table_schema)
+
+
+def table_to_records(table, kind: str) -> list[dict]:
+    """Inverse of ``records_to_table``: decode JSON columns back into dicts."""
+    json_columns = JSON_COLUMNS[kind]
+    records = []
+    for row in table.to_pylist():
+        extra = row.pop(EXTRA_COLUMN, None)
+        for name in json_columns:
+            if row.get(name) is not None:
+                row[name] = json.loads(row[name])
+        if extra:
+            row.update(json.loads(extra))
+        records.append(row)
+    return records
+
+
+def write_records(records, path: Path, kind: str, fmt: str = "yaml") -> Path:
+    """Write ``records`` to ``path`` (suffix chosen by ``fmt``) and return it."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+    path = Path(path).with_suffix(SUFFIXES[fmt])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "yaml":
+        with path.open("w", encoding="utf-8") as f:
+            yaml.safe_dump(list(records), f, sort_keys=False, allow_unicode=True)
+        return path
+    if fmt == "jsonl":
+        path.unlink(missing_ok=True)
+        with RecordWriter(path) as writer:
+            for record in records:
+                writer.append(record)
+        return path
+
+    table = records_to_table(records, kind, run_id=path.parent.name)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, path, compression="zstd")
+    else:
+        pa = _pyarrow()
+        options = pa.ipc.IpcWriteOptions(compression="zstd")
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+    return path
+
+
+def read_table(path: Path):
+    pa = _pyarrow()
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path)
+    if path.suffix == ".arrow":
+        with pa.memory_map(str(path)) as source:
+            return pa.ipc.open_file(source).read_all()
+    raise ValueError(f"Not a columnar file: {path}")
+
+
+def iter_table_rows(path: Path, kind: str, columns=None, batch_size: int = 1024):
+    """Stream the rows of a columnar run file as dicts, batch by batch.
+
+    Only ``columns`` are read; JSON columns are left encoded.
+    """
+    _pyarrow()
+    import pyarrow.dataset as ds
+
+    path = Path(path)
+    fmt = {".parquet": "parquet", ".arrow": "ipc"}.get(path.suffix)
+    if fmt is None:
+        raise ValueError(f"Not a columnar file: {path}")
+    dataset = ds.dataset(str(path), schema=schema(kind), format=fmt)
+    for batch in dataset.to_batches(columns=columns, batch_size=batch_size):
+        yield from batch.to_pylist()
+
+
+def read_records(path: Path, kind: str, cache: YamlCache | None = None) -> list[dict]:
+    """Read a run file of any supported format as a list of record dicts.
+
+    YAML files are parsed through ``cache`` when one is given.
+    """
+    path = Path(path)
+    if path.suffix == ".yaml":
+        data = load_yaml(path, cache)
+        if data is None:
+            return []
+        return data if isinstance(data, list) else [data]
+    if path.suffix == ".jsonl":
+        return list(iter_records(path))
+    return table_to_records(read_table(path), kind)
+
+
+def _columnar_files(run_dir: Path) -> list[Path]:
+    if not run_dir.is_dir():
+        return []
+    return sorted(
+        p for p in run_dir.iterdir() if p.suffix in (".parquet", ".arrow")
+    )
+
+
+def iter_columnar_paths(root: Path, pattern: str):
+    for run_dir in sorted(Path(root).glob(pattern)):
+        yield from _columnar_files(run_dir)
+
+
+def iter_record_paths(root: Path, pattern: str):
+    """Yield ``(run_dir, path)`` for YAML/JSONL run files not superseded by columnar ones."""
+    for run_dir in sorted(Path(root).glob(pattern)):
+        if not run_dir.is_dir() or _columnar_files(run_dir):
+            continue
+        for path in sorted(run_dir.iterdir()):
+            if path.suffix in RECORD_SUFFIXES:
+                yield run_dir, path
+
+
+def scan_runs(root: Path, pattern: str, kind: str, columns=None, with_source=False):
+    """Load every columnar file in the run directories under ``root`` as one table.
+
+    Parquet and Arrow files are scanned with ``pyarrow.dataset`` and only
+    ``columns`` are materialized. ``with_source`` adds a ``source_path``
+    column naming the file each row came from. Returns ``None`` if no file
+    is found.
+    """
+    paths = list(iter_columnar_paths(root, pattern))
+    if not paths:
+        return None
+    pa = _pyarrow()
+    import pyarrow.dataset as ds
+
+    by_format = {
+        "parquet": [str(p) for p in paths if p.suffix == ".parquet"],
+        "ipc": [str(p) for p in paths if p.suffix == ".arrow"],
+    }
+    tables = []
+    for fmt, files in by_format.items():
+        if not files:
+            continue
+        dataset = ds.dataset(files, schema=schema(kind), format=fmt)
+        if not with_source:
+            tables.append(dataset.to_table(columns=columns))
+            continue
+        for fragment in dataset.get_fragments():
+            table = fragment.to_table(schema=dataset.schema, columns=columns)
+            source = pa.array([fragment.path] * table.num_rows, pa.string())
+            tables.append(table.append_column("source_path", source))
+    return pa.concat_tables(tables) if len(tables) > 1 else tables[0]
+
+
+def events_table(applications):
+    """Flatten the ``events`` list column into one row per event.
+
+    Returns a table with the parent row index (``application_row``) plus the
+    event ``text`` and ``time``; applications without events yield no rows.
+    """
+    pa = _pyarrow()
+    import pyarrow.compute as pc
+
+    events = applications.column("events")
+    flat = pc.list_flatten(events)
+    parents = pc.list_parent_indices(events)
+    return pa.table(
+        {
+            "application_row": parents,
+            "text": pc.struct_field(flat, "text"),
+            "time": pc.struct_field(flat, "time"),
+        }
+    )
+
+
+def export_yaml(path: Path, kind: str, output: Path | None = None) -> Path:
+    """Write a columnar run file back to YAML for human inspection."""
+    output = Path(output) if output else Path(path).with_suffix(".yaml")
+    return write_records(read_records(path, kind), output, kind, "yaml")
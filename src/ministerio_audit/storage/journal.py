@@ -0,0 +1,133 @@
+"""SQLite journal of the jobs of one apply or consult campaign."""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from ministerio_audit.config import RUNS_DIR
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_DIR = RUNS_DIR / "campaigns"
+# target of the row that tracks a whole account (e.g. its applications list)
+ACCOUNT = "*"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    cv_id TEXT NOT NULL,
+    target TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    data TEXT,
+    updated_at REAL,
+    PRIMARY KEY (cv_id, target)
+)
+"""
+
+
+class CampaignJournal:
+    """Status of every (cv_id, target) job of a run, kept across restarts.
+
+    ``target`` is an offer id for apply runs and an application URL for
+    consult runs. A job is ``pending`` until started, ``running`` while a
+    browser works on it and ``done`` or ``failed`` afterwards; a job left
+    ``running`` by a crash is retried on resume like a failed one. The file
+    lives at ``JOURNAL_DIR/<run>.sqlite`` so ``--resume <run>`` finds it.
+    """
+
+    def __init__(self, run: str, root: Path = JOURNAL_DIR):
+        self.run = run
+        self.path = Path(root) / f"{run}.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # the scheduler reports from one thread per browser
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute(_SCHEMA)
+        self.conn.commit()
+
+    @classmethod
+    def exists(cls, run: str, root: Path = JOURNAL_DIR) -> bool:
+        return (Path(root) / f"{run}.sqlite").exists()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _execute(self, sql, params=()):
+        with self._lock, self.conn:
+            return self.conn.execute(sql, params).fetchall()
+
+    def add(self, jobs):
+        """Register ``(cv_id, target)`` jobs; known jobs keep their status."""
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO jobs (cv_id, target, updated_at) VALUES (?, ?, ?)",
+                [(cv_id, target, time.time()) for cv_id, target in jobs],
+            )
+
+    def start(self, cv_id, target):
+        self._execute(
+            "INSERT INTO jobs (cv_id, target, status, attempts, updated_at) "
+            "VALUES (?, ?, 'running', 1, ?) "
+            "ON CONFLICT (cv_id, target) DO UPDATE SET status = 'running', "
+            "attempts = attempts + 1, error = NULL, updated_at = excluded.updated_at",
+            (cv_id, target, time.time()),
+        )
+
+    def finish(self, cv_id, target, data=None):
+        """Mark a job done, keeping ``data`` so it can be written out later."""
+        self._execute(
+            "UPDATE jobs SET status = 'done', data = ?, updated_at = ? "
+            "WHERE cv_id = ? AND target = ?",
+            (json.dumps(data, ensure_ascii=False, default=str), time.time(), cv_id, target),
+        )
+
+    def fail(self, cv_id, target, error: str):
+        self._execute(
+            "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? "
+            "WHERE cv_id = ? AND target = ?",
+            (error, time.time(), cv_id, target),
+        )
+
+    def is_done(self, cv_id, target) -> bool:
+        rows = self._execute(
+            "SELECT 1 FROM jobs WHERE cv_id = ? AND target = ? AND status = 'done'",
+            (cv_id, target),
+        )
+        return bool(rows)
+
+    def done(self, cv_id=None) -> set[tuple[str, str]]:
+        sql = "SELECT cv_id, target FROM jobs WHERE status = 'done' AND target != ?"
+        params = (ACCOUNT,)
+        if cv_id is not None:
+            sql += " AND cv_id = ?"
+            params += (cv_id,)
+        return {tuple(row) for row in self._execute(sql, params)}
+
+    def results(self, cv_id) -> list:
+        """Data of the finished jobs of ``cv_id``, in the order they finished."""
+        rows = self._execute(
+            "SELECT data FROM jobs WHERE cv_id = ? AND target != ? AND status = 'done' "
+            "ORDER BY updated_at",
+            (cv_id, ACCOUNT),
+        )
+        return [json.loads(data) for (data,) in rows if data is not None]
+
+    def summary(self) -> dict:
+        rows = self._execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE target != ? GROUP BY status",
+            (ACCOUNT,),
+        )
+        return dict(rows)
@@ -0,0 +1,87 @@
+"""Append-only JSON Lines record files."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def _trim_partial_line(path: Path):
+    """Drop a half-written trailing line left by a crash mid-append."""
+    with path.open("rb+") as handle:
+        size = handle.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        handle.seek(size - 1)
+        if handle.read(1) == b"\n":
+            return
+        pos = size
+        while pos > 0:
+            step = min(4096, pos)
+            pos -= step
+            handle.seek(pos)
+            chunk = handle.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                pos += newline + 1
+                break
+        logger.warning("Truncating partial record at byte %s of %s", pos, path)
+        handle.truncate(pos)
+
+
+class RecordWriter:
+    """Append records to a JSON Lines file, one ``write`` per record.
+
+    Every append is flushed to the OS; ``os.fsync`` runs every
+    ``fsync_every`` records and on close. The file is valid JSON Lines after
+    a crash: a torn last line is ignored by ``iter_records`` and trimmed when
+    the file is reopened for appending.
+    """
+
+    def __init__(self, path: Path, fsync_every: int = 8):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            _trim_partial_line(self.path)
+        self.fsync_every = max(1, fsync_every)
+        self._handle = self.path.open("a", encoding="utf-8")
+        self._pending = 0
+
+    def append(self, record: dict):
+        self._handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._handle.flush()
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._pending = 0
+
+    def close(self):
+        if self._handle.closed:
+            return
+        self.sync()
+        self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_records(path: Path):
+    """Stream records from a JSON Lines file, skipping a torn last line."""
+    with Path(path).open(encoding="utf-8") as handle:
+        for lineno, line in enumerate(handle, start=1):
+            if not line.endswith("\n"):
+                logger.warning("Ignoring partial record at %s:%s", path, lineno)
+                return
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,195 @@
+"""Streaming sink for scraped offers: JSON Lines plus gzip CSV, written as they arrive.
+
+Every offer is appended to ``<name>.jsonl`` (a ``RecordWriter``, so a crash
+loses at most a torn last line) and flattened once into a gzip CSV part.
+Without a declared schema the columns are discovered as offers arrive: when
+an offer brings a new column, the current part is closed and a new one starts
+with the widened column list. ``finalize`` writes the consolidated
+``<name>.json`` (an array with one offer per line, copied from the JSONL)
+and ``<name>.csv``, the names ``save_offers_data`` has always used. The last
+part already has the final columns, so it is decompressed straight into the
+CSV, and only the rows of earlier, narrower parts are re-encoded.
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable
+
+from .records import RecordWriter, iter_records
+
+logger = logging.getLogger(__name__)
+
+COMPRESS_LEVEL = 6
+
+
+def _csv_safe_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def flatten_row(item: dict, prefix: str = "") -> dict:
+    """Nested dicts become dotted columns; lists and other dicts inside become JSON."""
+    flattened = {}
+    for key, value in item.items():
+        col = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flattened.update(flatten_row(value, col))
+        else:
+            flattened[col] = _csv_safe_value(value)
+    return flattened
+
+
+class OfferSink:
+    """Append offers to ``output_dir`` as they are scraped; ``finalize`` consolidates.
+
+    ``fieldnames`` declares the CSV columns up front: columns outside it are
+    dropped with a warning, and the CSV is a single part. Otherwise the
+    columns are the sorted union of every flattened offer, as
+    ``save_offers_data`` has always written them. ``fsync_every`` is passed
+    to the JSONL ``RecordWriter``.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        prefix: str = "infojobs_offers",
+        fieldnames: Iterable[str] | None = None,
+        name: str | None = None,
+        journal: bool = True,
+        fsync_every: int = 8,
+    ):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        name = name or f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.jsonl_path = self.output_dir / f"{name}.jsonl"
+        self.json_path = self.output_dir / f"{name}.json"
+        self.csv_path = self.output_dir / f"{name}.csv"
+        self._name = name
+        for stale in self.output_dir.glob(f"{name}.part*.csv.gz"):
+            stale.unlink()
+        self._journal = RecordWriter(self.jsonl_path, fsync_every) if journal else None
+        self._declared = fieldnames is not None
+        self._fields = list(fieldnames) if self._declared else []
+        self._known = set(self._fields)
+        self._dropped = set()
+        # (path, columns) of each CSV part, the open one last
+        self._parts = []
+        self._handle = None
+        self._writer = None
+        self.count = 0
+
+    def _open_part(self):
+        self._close_part()
+        path = self.output_dir / f"{self._name}.part{len(self._parts):03d}.csv.gz"
+        self._handle = gzip.open(path, "wt", encoding="utf-8", newline="", compresslevel=COMPRESS_LEVEL)
+        self._writer = csv.DictWriter(self._handle, fieldnames=self._fields, restval="", extrasaction="ignore")
+        self._parts.append((path, list(self._fields)))
+
+    def _close_part(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = self._writer = None
+
+    def append(self, offer: dict):
+        if self._journal is not None:
+            self._journal.append(offer)
+        row = flatten_row(offer)
+        new = [key for key in row if key not in self._known]
+        if new and self._declared:
+            fresh = set(new) - self._dropped
+            if fresh:
+                logger.warning("Dropping CSV columns outside the declared schema: %s", sorted(fresh))
+                self._dropped.update(fresh)
+        elif new:
+            self._known.update(new)
+            self._fields = sorted(self._known)
+            self._open_part()
+        if self._writer is None:
+            self._open_part()
+        self._writer.writerow(row)
+        self.count += 1
+
+    def extend(self, offers: Iterable[dict]):
+        for offer in offers:
+            self.append(offer)
+
+    def close(self):
+        """Close the open files; the JSONL and CSV parts stay for ``finalize``."""
+        self._close_part()
+        if self._journal is not None:
+            self._journal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_json(self):
+        tmp = self.json_path.with_name(self.json_path.name + ".tmp")
+        with self.jsonl_path.open(encoding="utf-8") as lines, tmp.open("w", encoding="utf-8") as f:
+            # a JSON array with one offer per line: the JSONL lines copied, not re-encoded
+            f.write("[")
+            written = 0
+            for line in lines:
+                if not line.endswith("\n"):
+                    logger.warning("Ignoring partial record at the end of %s", self.jsonl_path)
+                    break
+                if line.strip():
+                    f.write(("," if written else "") + "\n" + line[:-1])
+                    written += 1
+            f.write("\n]\n" if written else "]\n")
+        os.replace(tmp, self.json_path)
+
+    def _write_csv(self):
+        tmp = self.csv_path.with_name(self.csv_path.name + ".tmp")
+        *narrow, last = self._parts or [(None, self._fields)]
+        with tmp.open("w", encoding="utf-8", newline="") as out:
+            writer = csv.writer(out)
+            writer.writerow(self._fields)
+            position = {column: index for index, column in enumerate(self._fields)}
+            # earlier parts lack columns discovered later: spread their values out
+            for path, columns in narrow:
+                targets = [position[column] for column in columns]
+                with gzip.open(path, "rt", encoding="utf-8", newline="") as part:
+                    for values in csv.reader(part):
+                        row = [""] * len(self._fields)
+                        for index, value in zip(targets, values):
+                            row[index] = value
+                        writer.writerow(row)
+            # the last part is already in the final columns
+            if last[0] is not None:
+                out.flush()
+                with gzip.open(last[0], "rb") as part:
+                    shutil.copyfileobj(part, out.buffer, 1 << 20)
+        os.replace(tmp, self.csv_path)
+        for path, _ in self._parts:
+            path.unlink()
+        self._parts = []
+
+    def finalize(self, keep_jsonl: bool = True) -> tuple[Path, Path]:
+        """Write ``<name>.json`` and ``<name>.csv``; returns their paths."""
+        self.close()
+        self._write_json()
+        self._write_csv()
+        if not keep_jsonl:
+            self.jsonl_path.unlink()
+        logger.info("Consolidated %s offers into %s and %s", self.count, self.json_path, self.csv_path)
+        return self.json_path, self.csv_path
+
+    @classmethod
+    def recover(cls, jsonl_path: Path, fieldnames: Iterable[str] | None = None) -> tuple[Path, Path]:
+        """Consolidate the JSONL of a crawl that died before ``finalize``."""
+        jsonl_path = Path(jsonl_path)
+        sink = cls(jsonl_path.parent, fieldnames=fieldnames, name=jsonl_path.stem, journal=False)
+        sink.extend(iter_records(jsonl_path))
+        return sink.finalize()
@@ -0,0 +1,90 @@
+"""Last known state of each consulted application, per CV."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from ministerio_audit.config import RUNS_DIR
+
+SNAPSHOT_DIR = RUNS_DIR / "consult" / "snapshots"
+# identify the application in every delta record
+KEY_FIELDS = ("cv_id", "url", "timestamp", "job_title", "offer_link")
+
+
+def application_delta(previous: dict | None, current: dict) -> dict:
+    """Reduce ``current`` to what changed since ``previous``.
+
+    The delta keeps the identifying fields, the fields whose value changed
+    (listed in ``changed``) and only the events not seen before. Without a
+    previous state the full record is returned.
+    """
+    if previous is None:
+        return current
+    delta = {name: current.get(name) for name in KEY_FIELDS if name in current}
+    changed = []
+    for name, value in current.items():
+        if name in KEY_FIELDS or name == "events":
+            continue
+        if previous.get(name) != value:
+            delta[name] = value
+            changed.append(name)
+    seen = {(e.get("text"), e.get("time")) for e in previous.get("events") or []}
+    delta["events"] = [
+        e for e in current.get("events") or [] if (e.get("text"), e.get("time")) not in seen
+    ]
+    if delta["events"]:
+        changed.append("events")
+    delta["changed"] = changed
+    delta["incremental"] = True
+    delta["previous_timestamp"] = previous.get("timestamp")
+    return delta
+
+
+class ApplicationSnapshots:
+    """Fingerprint and full record of the applications of one CV.
+
+    Stored as ``SNAPSHOT_DIR/<cv_id>.json``. Updates are buffered and the
+    file is rewritten atomically by ``flush``, once per CV; used as a context
+    manager it flushes on exit, also after a crash. Update only after the
+    record has been written so a crash never loses changes.
+    """
+
+    def __init__(self, cv_id: str, root: Path = SNAPSHOT_DIR):
+        self.cv_id = cv_id
+        self.path = Path(root) / f"{cv_id}.json"
+        self.state = {}
+        self._dirty = False
+        if self.path.exists():
+            with self.path.open(encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def unchanged(self, url: str, fingerprint: str) -> bool:
+        return self.state.get(url, {}).get("fingerprint") == fingerprint
+
+    def record(self, url: str) -> dict | None:
+        return self.state.get(url, {}).get("record")
+
+    def delta(self, url: str, record: dict) -> dict:
+        return application_delta(self.record(url), record)
+
+    def update(self, url: str, fingerprint: str, record: dict):
+        self.state[url] = {"fingerprint": fingerprint, "record": record}
+        self._dirty = True
+
+    def flush(self):
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
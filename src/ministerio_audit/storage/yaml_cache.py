@@ -0,0 +1,127 @@
+"""YAML loading with libyaml and a persistent cache of parsed files.
+
+``load_yaml`` uses the C ``CSafeLoader`` when PyYAML was built with libyaml
+and falls back to the pure-Python ``SafeLoader`` otherwise. ``YamlCache``
+keeps the parsed result of each file as a pickle keyed by its path, size
+and mtime, so unchanged run files are not parsed again; the oldest entries
+are evicted once the cache outgrows ``max_bytes``. One cache can be shared
+by threads, such as the panel build stages.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+
+import yaml
+
+from ministerio_audit.config import RUNS_DIR
+
+logger = logging.getLogger(__name__)
+
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_CACHE_DIR = RUNS_DIR / "cache" / "yaml"
+MAX_CACHE_BYTES = 512 * 1024**2
+
+
+def load_yaml(path: Path, cache: YamlCache | None = None):
+    """Parse the YAML file at ``path``, through ``cache`` if given."""
+    if cache is not None:
+        return cache.load(path)
+    with Path(path).open(encoding="utf-8") as handle:
+        return yaml.load(handle, Loader=SafeLoader)
+
+
+class YamlCache:
+    def __init__(self, root: Path = YAML_CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        # guards the counters, _size and prune
+        self._lock = threading.Lock()
+
+    def _entry(self, path: Path) -> Path:
+        stat = path.stat()
+        key = f"{path.resolve()}\0{stat.st_size}\0{stat.st_mtime_ns}"
+        return self.root / f"{hashlib.sha1(key.encode()).hexdigest()}.pickle"
+
+    def load(self, path: Path):
+        path = Path(path)
+        entry = self._entry(path)
+        try:
+            with entry.open("rb") as handle:
+                data = pickle.load(handle)
+        except FileNotFoundError:
+            pass
+        except Exception as exc:
+            logger.warning("Ignoring unreadable cache entry %s: %r", entry, exc)
+        else:
+            with self._lock:
+                self.hits += 1
+            try:
+                os.utime(entry)  # eviction drops the least recently used
+            except FileNotFoundError:
+                pass
+            return data
+        with self._lock:
+            self.misses += 1
+        data = load_yaml(path)
+        self._put(entry, data)
+        return data
+
+    def _put(self, entry: Path, data):
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=entry.stem, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                pickle.dump(data, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, entry)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        size = entry.stat().st_size
+        with self._lock:
+            if self._size is None:
+                self._size = sum(p.stat().st_size for p in self.root.glob("*.pickle"))
+            else:
+                self._size += size
+            if self._size > self.max_bytes:
+                self._prune()
+
+    def prune(self):
+        """Drop the least recently used entries until the cache is 80% full."""
+        with self._lock:
+            self._prune()
+
+    def _prune(self):
+        entries = []
+        for entry in self.root.glob("*.pickle"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        entries.sort()
+        size = sum(item[1] for item in entries)
+        target = self.max_bytes * 0.8
+        removed = 0
+        for _, entry_size, entry in entries:
+            if size <= target:
+                break
+            entry.unlink(missing_ok=True)
+            size -= entry_size
+            removed += 1
+        self._size = size
+        if removed:
+            logger.info("Evicted %s YAML cache entries from %s", removed, self.root)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}